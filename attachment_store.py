@@ -0,0 +1,38 @@
+# attachment_store.py
+import hashlib
+import os
+import threading
+
+
+class AttachmentStore:
+    """
+    Content-addressed archive of attachments and reports on local disk.
+    Each blob is stored once under its SHA-256, so identical files share
+    one copy and same-named files from different senders never collide.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def path_for(self, digest, extension=""):
+        return os.path.join(self.root, digest[:2], digest + extension)
+
+    def put(self, data, extension=""):
+        """
+        Writes data unless an identical blob is already stored.
+        Returns its SHA-256 hex digest.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, extension)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique per thread: two workers may archive the same blob at once
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest, extension=""):
+        with open(self.path_for(digest, extension), 'rb') as file:
+            return file.read()
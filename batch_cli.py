@@ -0,0 +1,293 @@
+# batch_cli.py
+"""
+Evaluates a directory of MTE workbooks offline, without Gmail or Drive:
+extract_mte_data -> evaluation -> PDF report for every .xlsx under the input
+directory, on the staged pipeline.
+
+Every finished file is appended to <output>/manifest.jsonl. On restart, files
+already recorded as "ok" with the same content hash are skipped, so a crashed
+or interrupted run resumes where it stopped.
+
+    python batch_cli.py submissions/ --output batch_output --concurrency 8
+    python batch_cli.py submissions/ --dry-run            # parse only, write nothing
+    python batch_cli.py submissions/ --stub-model 0.5     # fake evaluation, 0.5 s each
+    python batch_cli.py submissions/ --groq-batch         # one Groq Batch API job
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from config import DEFAULT_MODEL
+from evaluator import SECTION_KEYS, evaluation_cache_key
+from pipeline import StagedPipeline
+from render_pool import render_report
+from utils import extract_mte_data
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def find_workbooks(input_dir):
+    """
+    Returns the .xlsx files under input_dir as sorted relative paths,
+    skipping Excel lock files (~$name.xlsx).
+    """
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith('.xlsx') and not name.startswith('~$'):
+                paths.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return sorted(paths)
+
+
+def load_manifest(path):
+    """
+    Returns {relative path: sha256} of the files already processed successfully.
+    A truncated last line from a crash is ignored.
+    """
+    done = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("status") == "ok":
+                    done[entry["file"]] = entry["sha256"]
+                else:
+                    done.pop(entry.get("file"), None)
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class Manifest:
+    """
+    Append-only JSONL record of finished files, safe to write from many threads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def append(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def stub_evaluate(mte_data, latency=0.0):
+    """
+    Deterministic stand-in for the model: scores each section by its length
+    after sleeping latency seconds, so throughput can be measured offline.
+    """
+    time.sleep(latency)
+    section_scores = {}
+    for key in SECTION_KEYS:
+        words = len(mte_data.get(key, "").split())
+        section_scores[key] = {
+            "score": min(10, 1 + words // 15),
+            "reason": f"Stub evaluation of {words} words.",
+            "feedback": "Stub feedback.",
+            "suggestions": "Stub suggestions."
+        }
+    scores = [details["score"] for details in section_scores.values()]
+    return {
+        "overall_score": round(sum(scores) / len(scores)),
+        "section_scores": section_scores,
+        "strengths": ["Stub strength."],
+        "areas_for_improvement": ["Stub area for improvement."],
+        "suggestions": ["Stub suggestion."]
+    }
+
+
+def process_file(pipeline, input_dir, output_dir, relative_path, evaluate, dry_run=False):
+    """
+    Runs one workbook through parse -> evaluate -> render and returns its
+    manifest entry. Raises on failure; the caller records the error.
+    """
+    with open(os.path.join(input_dir, relative_path), 'rb') as file:
+        data = file.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    mte_data = pipeline.call("parse", extract_mte_data, io.BytesIO(data))
+    if "error" in mte_data:
+        raise RuntimeError(mte_data["error"])
+    if dry_run:
+        return {"file": relative_path, "sha256": digest, "status": "ok"}
+
+    feedback = pipeline.call("evaluate", evaluate, mte_data)
+    if "error" in feedback:
+        raise RuntimeError(f"Evaluation failed: {feedback['error']}")
+    feedback.update({
+        "student_name": mte_data.get("student_name", "N/A"),
+        "submission_month": mte_data.get("submission_month", "N/A"),
+        "college_name": mte_data.get("college_name", "N/A"),
+        "class_info": mte_data.get("class_info", "N/A")
+    })
+
+    # Reports mirror the input tree, so same-named files never collide
+    pdf_bytes = pipeline.call("render", render_report, feedback)
+    pdf_path = os.path.join(output_dir, "reports", os.path.splitext(relative_path)[0] + '_feedback.pdf')
+    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+    with open(pdf_path, 'wb') as file:
+        file.write(pdf_bytes)
+
+    return {
+        "file": relative_path,
+        "sha256": digest,
+        "status": "ok",
+        "student_name": feedback["student_name"],
+        "overall_score": feedback.get("overall_score"),
+        "pdf": os.path.relpath(pdf_path, output_dir),
+        "feedback": feedback
+    }
+
+
+def parse_all(input_dir, paths, concurrency):
+    """
+    Returns {relative path: mte_data} for the workbooks that parse cleanly.
+    """
+    def parse(pipeline, relative_path):
+        with open(os.path.join(input_dir, relative_path), 'rb') as file:
+            return pipeline.call("parse", extract_mte_data, io.BytesIO(file.read()))
+
+    with StagedPipeline({"in_flight": concurrency}) as pipeline:
+        results = pipeline.run(parse, paths)
+    return {path: mte_data for path, mte_data, error in results if error is None and "error" not in mte_data}
+
+
+def batch_api_evaluator(input_dir, paths, model, concurrency, refresh=False):
+    """
+    Evaluates all the workbooks in one Groq Batch API job up front and
+    returns an evaluate(mte_data) function that looks the results up.
+    """
+    from groq_batch import evaluate_batch
+
+    submissions = parse_all(input_dir, paths, concurrency)
+    feedbacks = evaluate_batch(submissions, model, refresh=refresh)
+    by_key = {
+        evaluation_cache_key(mte_data, model): feedbacks[path]
+        for path, mte_data in submissions.items()
+    }
+
+    def evaluate(mte_data):
+        return dict(by_key.get(evaluation_cache_key(mte_data, model), {"error": "Not part of the batch."}))
+    return evaluate
+
+
+def run_batch(input_dir, output_dir, model=DEFAULT_MODEL, concurrency=8, refresh=False,
+              dry_run=False, stub_latency=None, limit=None, groq_batch=False):
+    """
+    Processes every workbook under input_dir not yet recorded in the manifest.
+    With groq_batch, the evaluations go through one Groq Batch API job
+    before any report is rendered. Returns (processed, failed, skipped) counts.
+    """
+    paths = find_workbooks(input_dir)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    done = load_manifest(manifest_path)
+
+    pending = []
+    for relative_path in paths:
+        if relative_path in done:
+            with open(os.path.join(input_dir, relative_path), 'rb') as file:
+                if hashlib.sha256(file.read()).hexdigest() == done[relative_path]:
+                    continue
+        pending.append(relative_path)
+    skipped = len(paths) - len(pending)
+    if limit is not None:
+        pending = pending[:limit]
+    print(f'Found {len(paths)} workbooks: {skipped} already done, {len(pending)} to process.')
+
+    if stub_latency is not None:
+        def evaluate(mte_data):
+            return stub_evaluate(mte_data, stub_latency)
+        model = "stub"
+    elif groq_batch and not dry_run:
+        evaluate = batch_api_evaluator(input_dir, pending, model, concurrency, refresh=refresh)
+    else:
+        from model_router import get_router
+        router = get_router()
+
+        def evaluate(mte_data):
+            return router.evaluate(mte_data, preferred=model, refresh=refresh)
+
+    limits = {"in_flight": concurrency, "evaluate": concurrency}
+    manifest = None
+    if not dry_run:
+        os.makedirs(output_dir, exist_ok=True)
+        manifest = Manifest(manifest_path)
+
+    counts = {"processed": 0, "failed": 0}
+    counts_lock = threading.Lock()
+
+    def handle(pipeline, relative_path):
+        started = time.perf_counter()
+        try:
+            entry = process_file(pipeline, input_dir, output_dir, relative_path, evaluate, dry_run=dry_run)
+        except Exception as e:
+            entry = {"file": relative_path, "status": "error", "error": str(e)}
+        entry.update({
+            "model": model,
+            "seconds": round(time.perf_counter() - started, 3),
+            "time": datetime.now().isoformat(timespec='seconds')
+        })
+        if manifest:
+            manifest.append(entry)
+        with counts_lock:
+            counts["processed" if entry["status"] == "ok" else "failed"] += 1
+            finished = counts["processed"] + counts["failed"]
+        if entry["status"] != "ok":
+            print(f'Failed {relative_path}: {entry["error"]}')
+        if finished % 50 == 0 or finished == len(pending):
+            print(f'{finished}/{len(pending)} done')
+        return entry
+
+    started = time.perf_counter()
+    try:
+        with StagedPipeline(limits) as pipeline:
+            pipeline.run(handle, pending)
+    finally:
+        if manifest:
+            manifest.close()
+
+    elapsed = time.perf_counter() - started
+    rate = len(pending) / elapsed if elapsed > 0 else 0.0
+    print(f'Processed {counts["processed"]}, failed {counts["failed"]}, skipped {skipped} '
+          f'in {elapsed:.1f}s ({rate:.2f} files/s).')
+    return counts["processed"], counts["failed"], skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_dir", help="directory searched recursively for .xlsx files")
+    parser.add_argument("--output", default="batch_output", help="directory for reports/ and manifest.jsonl")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="preferred model; the router falls back to the others")
+    parser.add_argument("--concurrency", type=int, default=8, help="files in flight and concurrent evaluations")
+    parser.add_argument("--refresh", action="store_true", help="ignore the evaluation cache")
+    parser.add_argument("--limit", type=int, default=None, help="process at most this many files")
+    parser.add_argument("--dry-run", action="store_true", help="only parse the workbooks; write nothing")
+    parser.add_argument("--stub-model", type=float, default=None, metavar="LATENCY",
+                        help="replace the model with a local stub that takes LATENCY seconds")
+    parser.add_argument("--groq-batch", action="store_true",
+                        help="evaluate through the Groq Batch API (see GROQ_BATCH in config.py)")
+    args = parser.parse_args(argv)
+
+    _, failed, _ = run_batch(
+        args.input_dir, args.output, model=args.model, concurrency=args.concurrency,
+        refresh=args.refresh, dry_run=args.dry_run, stub_latency=args.stub_model, limit=args.limit,
+        groq_batch=args.groq_batch
+    )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,225 @@
+# benchmarks/bench_e2e.py
+"""
+End-to-end benchmark of gmail_integration.main without Google or Groq
+accounts. A fake mailbox is filled with synthetic MTE workbooks, Gmail and
+Drive are replaced by in-memory fakes (fake_google.py) and the evaluator
+talks to a local fake Groq server (fake_groq_server.py), each with the
+latency and error rates of the chosen profile. The run reports per-stage and
+per-submission latency percentiles and submissions per minute.
+
+    python benchmarks/bench_e2e.py [--profile typical] [--messages 40]
+    python benchmarks/bench_e2e.py --groq-latency 5 --limits evaluate=8,in_flight=16
+    python benchmarks/bench_e2e.py --json results.json   # keep the numbers for comparison
+
+Stage times run from submission to the stage's pool until its result is
+ready, so they include queueing behind PIPELINE_LIMITS. The configured
+Groq rate limits are bypassed unless --rate-limits is given.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCH_DIR = os.getcwd()
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from fake_google import FakeDrive, FakeGmail
+from fake_groq_server import start_server
+from synthetic_mte import build_xlsx_bytes
+
+PROFILES = {
+    "fast": dict(groq_latency=0.2, groq_jitter=0.05, groq_error_rate=0.0, rate_limit_rate=0.0,
+                 gmail_latency=0.01, drive_latency=0.02),
+    "typical": dict(groq_latency=3.0, groq_jitter=1.0, groq_error_rate=0.02, rate_limit_rate=0.02,
+                    gmail_latency=0.08, drive_latency=0.15),
+    "degraded": dict(groq_latency=8.0, groq_jitter=4.0, groq_error_rate=0.1, rate_limit_rate=0.1,
+                     gmail_latency=0.3, drive_latency=0.5),
+}
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+class Timings:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def wrap(self, name, fn):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - started)
+        return timed
+
+    def summary(self):
+        return {
+            name: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99),
+                "max": max(values),
+            }
+            for name, values in self.samples.items()
+        }
+
+
+def parse_limits(text):
+    limits = {}
+    for item in filter(None, (text or "").split(",")):
+        stage, value = item.split("=")
+        limits[stage.strip()] = int(value)
+    return limits
+
+
+def fill_mailbox(gmail, messages, seed):
+    for i in range(messages):
+        gmail.add_submission(
+            sender=f"Student {i} <student{i}@example.com>",
+            cc=f"mentor{i % 5}@example.com",
+            subject="MTE submission",
+            filename=f"MTE_student{i}.xlsx",
+            data=build_xlsx_bytes(seed=seed + i)
+        )
+
+
+def run(args, profile):
+    groq = start_server(
+        chat_latency=profile["groq_latency"], chat_jitter=profile["groq_jitter"],
+        chat_error_rate=profile["groq_error_rate"], rate_limit_rate=profile["rate_limit_rate"],
+        retry_after=args.retry_after
+    )
+    # The Groq SDK picks this up for the evaluator's client
+    os.environ["GROQ_BASE_URL"] = groq.base_url
+
+    import config
+    # Every synthetic workbook would otherwise be answered from an earlier run's cache
+    config.EVALUATION_CACHE["enabled"] = False
+
+    import evaluator
+    import gmail_integration
+    import metrics
+    import utils
+    from folder_cache import FolderCache
+    from ledger import Ledger
+    from pipeline import StagedPipeline
+    from rate_limiter import ModelRateLimiter
+
+    evaluator.get_api_key_from_json = lambda key_name: "benchmark"
+    if not args.rate_limits:
+        evaluator.rate_limiter = ModelRateLimiter({})
+
+    # Keep the run's state files out of the working tree
+    state_dir = tempfile.mkdtemp(prefix="mte-bench-")
+    gmail_integration.folder_cache = FolderCache(os.path.join(state_dir, "folder_cache.json"))
+    gmail_integration._ledger = Ledger(os.path.join(state_dir, "ledger.sqlite3"))
+    metrics.get_metrics().trace_path = os.path.join(state_dir, "trace.jsonl")
+    metrics.get_metrics().textfile_path = os.path.join(state_dir, "mte_pipeline.prom")
+    utils.FEEDBACK_HISTORY_DIR = os.path.join(state_dir, "history")
+
+    gmail = FakeGmail(latency=profile["gmail_latency"])
+    drive = FakeDrive(latency=profile["drive_latency"])
+    fill_mailbox(gmail, args.messages, args.seed)
+    gmail_integration.authenticate_services = lambda: (gmail, drive)
+    gmail_integration.thread_services = lambda: (gmail, drive)
+
+    timings = Timings()
+
+    class TimedPipeline(StagedPipeline):
+        def submit(self, stage, fn, *args, **kwargs):
+            started = time.perf_counter()
+            future = super().submit(stage, fn, *args, **kwargs)
+            future.add_done_callback(lambda _: timings.add(stage, time.perf_counter() - started))
+            return future
+
+    gmail_integration.StagedPipeline = TimedPipeline
+    for name in ("get_unread_messages", "get_messages", "get_xlsx_attachments", "prepare_drive", "mark_as_read"):
+        setattr(gmail_integration, name, timings.wrap(name, getattr(gmail_integration, name)))
+    gmail_integration.process_message = timings.wrap("end_to_end", gmail_integration.process_message)
+
+    started = time.perf_counter()
+    results = gmail_integration.main(limits=parse_limits(args.limits))
+    elapsed = time.perf_counter() - started
+    groq.shutdown()
+
+    processed = sum(1 for _, result, error in results if error is None and result)
+    return {
+        "profile": profile,
+        "messages": args.messages,
+        "limits": parse_limits(args.limits),
+        "seconds": elapsed,
+        "processed": processed,
+        "failed": len(results) - processed,
+        "per_minute": processed / elapsed * 60 if elapsed > 0 else 0.0,
+        "stages": timings.summary(),
+        "groq": dict(groq.state.chat_counts),
+        "gmail_calls": gmail.calls,
+        "drive_calls": drive.calls,
+        "emails_sent": len(gmail.sent),
+        "uploads": len(drive.uploads),
+    }
+
+
+def report(result):
+    profile = result["profile"]
+    print(f"{result['messages']} messages | Groq {profile['groq_latency']}±{profile['groq_jitter']} s, "
+          f"{profile['groq_error_rate']:.0%} errors, {profile['rate_limit_rate']:.0%} 429s | "
+          f"Gmail {profile['gmail_latency'] * 1000:.0f} ms, Drive {profile['drive_latency'] * 1000:.0f} ms per call")
+    print(f"\n{'stage':<22} {'count':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}   (ms)")
+    for name, stats in sorted(result["stages"].items(), key=lambda item: item[0] == "end_to_end"):
+        print(f"{name:<22} {stats['count']:>6} " + " ".join(
+            f"{stats[key] * 1000:9.1f}" for key in ("p50", "p90", "p99", "max")
+        ))
+    groq = result["groq"]
+    print(f"\nProcessed {result['processed']}/{result['messages']} ({result['failed']} failed) "
+          f"in {result['seconds']:.1f} s: {result['per_minute']:.1f} submissions/min")
+    print(f"Groq requests {groq['requests']} ({groq['rate_limited']} rate limited, {groq['failed']} failed); "
+          f"Gmail calls {result['gmail_calls']}, Drive calls {result['drive_calls']}; "
+          f"emails sent {result['emails_sent']}, uploads {result['uploads']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--limits", default="", help="PIPELINE_LIMITS overrides, e.g. evaluate=8,in_flight=16")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate-limits", action="store_true", help="keep the MODEL_RATE_LIMITS from config.py")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds on fake 429s")
+    parser.add_argument("--json", help="also write the results to this file")
+    for key in PROFILES["typical"]:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=None,
+                            help=f"override the profile's {key}")
+    args = parser.parse_args()
+
+    profile = dict(PROFILES[args.profile])
+    for key in profile:
+        if getattr(args, key) is not None:
+            profile[key] = getattr(args, key)
+
+    result = run(args, profile)
+    report(result)
+    if args.json:
+        with open(os.path.join(LAUNCH_DIR, args.json), 'w') as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
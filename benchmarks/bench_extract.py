@@ -0,0 +1,202 @@
+# benchmarks/bench_extract.py
+"""
+Compares extract_mte_data against the previous full-load implementation on
+synthetic workbooks of growing size, checking that both return the same dict.
+
+    python benchmarks/bench_extract.py [--repeat 3] [--backend ooxml|openpyxl]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import unicodedata
+from collections import deque
+from datetime import datetime
+from openpyxl import load_workbook
+from openpyxl.styles import Border
+from synthetic_mte import build_xlsx_bytes
+from utils import HEADING_TO_KEY_MAP, extract_mte_data
+
+CASES = [
+    ("plain template", dict(padding_rows=0, padding_cols=0)),
+    ("padded 1k cells", dict(padding_rows=100, padding_cols=10)),
+    ("padded 20k cells", dict(padding_rows=1000, padding_cols=20)),
+    ("padded 100k cells", dict(padding_rows=2000, padding_cols=50)),
+]
+
+
+def legacy_extract_mte_data(file_path):
+    """
+    The full-mode openpyxl extractor that read_sheet_grid replaced, kept
+    verbatim as the reference for timing and output parity.
+    """
+    def normalize(value):
+        if not isinstance(value, str):
+            return ""
+        return unicodedata.normalize("NFKD", value).strip()
+
+    def has_border(cell):
+        border: Border = cell.border
+        sides = [border.left, border.right, border.top, border.bottom]
+        return any(side.style is not None for side in sides)
+
+    try:
+        workbook = load_workbook(file_path)
+        sheet = workbook.worksheets[0]
+
+        # --- Extract raw metadata lines (Rows 2 and 4 expected, fallback if missing) ---
+        raw_student_info = normalize(sheet.cell(2, 2).value or "")
+        raw_college_info = normalize(sheet.cell(4, 2).value or "")
+
+        # --- Extract Name and Month robustly ---
+        student_name, submission_month = "N/A", "N/A"
+        student_match = re.search(r"Student\s*[:\-]?\s*(.+?)\s+for\s+the\s+month\s+of\s+([A-Za-z]+)", raw_student_info, re.IGNORECASE)
+        if student_match:
+            student_name = student_match.group(1).strip()
+            submission_month = f"{student_match.group(2).capitalize()} , {datetime.now().year}"
+
+        # --- Clean and Normalize College/Class Line ---
+        raw_college_info_clean = re.sub(r"[_\s]+", " ", raw_college_info).strip()
+
+        college_name, class_info = "N/A", "N/A"
+        match_college = re.search(r"College\s*[:\-]?\s*(.+?)\s+Year\s+of\s+Study", raw_college_info_clean, re.IGNORECASE)
+        match_year = re.search(r"Year\s+of\s+Study\s*[:\-]?\s*(.+)", raw_college_info_clean, re.IGNORECASE)
+        if match_college:
+            college_name = match_college.group(1).strip()
+        if match_year:
+            class_info = match_year.group(1).strip()
+
+        # --- Extract bordered tables ---
+        border_map = {}
+        for row in sheet.iter_rows():
+            for cell in row:
+                if has_border(cell):
+                    border_map[(cell.row, cell.column)] = normalize(cell.value)
+
+        visited = set()
+        groups = []
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+        for cell in border_map:
+            if cell not in visited:
+                group = []
+                queue = deque([cell])
+                visited.add(cell)
+                while queue:
+                    current = queue.popleft()
+                    group.append(current)
+                    for dr, dc in directions:
+                        neighbor = (current[0] + dr, current[1] + dc)
+                        if neighbor in border_map and neighbor not in visited:
+                            visited.add(neighbor)
+                            queue.append(neighbor)
+                groups.append(group)
+
+        extracted_tables = []
+        for group in groups:
+            rows = [r for r, _ in group]
+            cols = [c for _, c in group]
+            min_row, max_row = min(rows), max(rows)
+            min_col, max_col = min(cols), max(cols)
+
+            table = []
+            for r in range(min_row, max_row + 1):
+                row_data = []
+                for c in range(min_col, max_col + 1):
+                    value = normalize(sheet.cell(r, c).value)
+                    if value:
+                        row_data.append(value)
+                if row_data:
+                    table.append(row_data)
+
+            if table:
+                heading = " ".join(table[0])
+                rows_as_string = "\n".join("    " + " | ".join(row) for row in table[1:])
+                extracted_tables.append({"heading": heading.strip(), "rows": rows_as_string.strip()})
+
+        # --- Map headings to dictionary keys ---
+        mte_dict = {}
+        heading_to_key_map = {
+            "Academic Progress / Vacation Plan": "academic_progress",
+            "Co and Extra Curricular Progress-Plan": "co-curricular",
+            "Fin Reqm for the next 3 months (Details Please)": "financial_needs",
+            "Difficulties (Social, Family, etc.)": "difficulties",
+            "Results of the exams": "exam_results",
+            "Reading Books / Watching Videos": "books_and_videos",
+            "exercise regularly and eat and sleep": "health",
+            "friends or acquaintances made": "learning_from_people",
+            "Essay on a topic of your choice": "essay",
+            "Action Plan for the coming month": "action_plan"
+        }
+
+        for table in extracted_tables:
+            for expected_heading, dict_key in heading_to_key_map.items():
+                if expected_heading.lower() in table['heading'].lower():
+                    mte_dict[dict_key] = table['rows']
+                    break
+
+        return {
+            "student_name": student_name,
+            "submission_month": submission_month,
+            "college_name": college_name,
+            "class_info": class_info,
+            "academic_progress": mte_dict.get("academic_progress", ""),
+            "co-curricular": mte_dict.get("co-curricular", ""),
+            "financial_needs": mte_dict.get("financial_needs", ""),
+            "difficulties": mte_dict.get("difficulties", ""),
+            "exam_results": mte_dict.get("exam_results", ""),
+            "books_and_videos": mte_dict.get("books_and_videos", ""),
+            "health": mte_dict.get("health", ""),
+            "learning_from_people": mte_dict.get("learning_from_people", ""),
+            "essay": mte_dict.get("essay", ""),
+            "action_plan": mte_dict.get("action_plan", "")
+        }
+
+    except Exception as e:
+        return {"error": f"Error extracting data: {e}"}
+
+
+def measure(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(io.BytesIO(data))
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn(io.BytesIO(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", choices=["ooxml", "openpyxl"], default=None)
+    args = parser.parse_args()
+
+    print(f"{'case':<20}{'size':>10}{'legacy':>12}{'current':>12}{'speedup':>10}{'peak MB':>16}  parity")
+    for name, options in CASES:
+        data = build_xlsx_bytes(seed=7, **options)
+        legacy, legacy_time, legacy_peak = measure(legacy_extract_mte_data, data, args.repeat)
+        current, current_time, current_peak = measure(
+            lambda source: extract_mte_data(source, backend=args.backend), data, args.repeat
+        )
+        parity = "ok" if legacy == current and "error" not in current else "MISMATCH"
+        print(
+            f"{name:<20}{len(data) // 1024:>8}KB{legacy_time * 1000:>10.1f}ms{current_time * 1000:>10.1f}ms"
+            f"{legacy_time / current_time:>9.1f}x{legacy_peak / 2**20:>8.1f} / {current_peak / 2**20:<5.1f}  {parity}"
+        )
+        sections = sum(1 for key in HEADING_TO_KEY_MAP.values() if current.get(key))
+        if sections != len(HEADING_TO_KEY_MAP):
+            print(f"  only {sections} of {len(HEADING_TO_KEY_MAP)} sections extracted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_google_build.py
+"""
+Times building the Gmail and Drive clients for a pool of worker threads:
+googleapiclient's build() per service and thread (the previous
+thread_services) against google_services.build_service, which parses each
+bundled discovery document once per process. No network access is needed.
+
+    python benchmarks/bench_google_build.py [--threads 8] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+import google_services
+
+SERVICES = (("gmail", "v1"), ("drive", "v3"))
+
+
+def legacy_build(credentials):
+    return [build(name, version, credentials=credentials) for name, version in SERVICES]
+
+
+def cached_build(credentials):
+    return [google_services.build_service(name, version, credentials) for name, version in SERVICES]
+
+
+def time_threads(build_fn, credentials, threads):
+    """
+    Seconds until every thread has built its clients, as at worker start-up.
+    """
+    workers = [threading.Thread(target=build_fn, args=(credentials,)) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Each repeat is a fresh process start as far as the document cache is concerned
+    credentials = Credentials(token="benchmark")
+    results = {"build() per thread": [], "build_service": []}
+    for _ in range(args.repeat):
+        results["build() per thread"].append(time_threads(legacy_build, credentials, args.threads))
+        google_services._documents.clear()
+        results["build_service"].append(time_threads(cached_build, credentials, args.threads))
+
+    print(f"Gmail + Drive clients for {args.threads} threads (best of {args.repeat}):")
+    for label, times in results.items():
+        print(f"  {label:<20} {min(times) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
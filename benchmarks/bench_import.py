@@ -0,0 +1,77 @@
+# benchmarks/bench_import.py
+"""
+Import-time regression check for the entry-point modules. Each module is
+imported in a fresh interpreter (median of --repeat runs), and the run fails
+if a heavy dependency that should load lazily, on first use, is already in
+sys.modules after the import, or if a module exceeds --budget-ms.
+
+    python benchmarks/bench_import.py [--repeat 5] [--budget-ms 500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> dependencies that importing it must not pull in
+LAZY = {
+    "utils": ("openpyxl",),
+    "evaluator": ("streamlit", "groq", "openpyxl"),
+    "model_router": ("streamlit", "groq", "openpyxl"),
+    "render_pool": ("fpdf", "fontTools"),
+    "pipeline": ("fpdf", "fontTools", "openpyxl"),
+    "batch_cli": ("streamlit", "groq", "fpdf", "openpyxl"),
+    "gmail_integration": ("streamlit", "groq", "fpdf", "openpyxl", "google_auth_oauthlib"),
+    "gmail_watch": ("streamlit", "groq", "fpdf", "openpyxl", "google_auth_oauthlib"),
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {lazy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module, lazy):
+    """
+    Imports module in a fresh interpreter; returns (seconds, eagerly loaded deps).
+    """
+    env = {**os.environ, "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "benchmark")}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, lazy=lazy)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if any median import exceeds this")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<20} {'median':>10}  eagerly loaded")
+    for module, lazy in LAZY.items():
+        runs = [measure(module, lazy) for _ in range(args.repeat)]
+        median_ms = statistics.median(seconds for seconds, _ in runs) * 1000
+        loaded = runs[-1][1]
+        print(f"{module:<20} {median_ms:8.1f} ms  {', '.join(loaded) or '-'}")
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)} eagerly")
+        if args.budget_ms is not None and median_ms > args.budget_ms:
+            failures.append(f"{module} takes {median_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,264 @@
+# benchmarks/bench_pdf.py
+"""
+Renders synthetic feedback reports with the previous generate_pdf (a new
+FPDF and two add_font calls per report) and with the shared ReportRenderer,
+and compares time per report, PDF size and page content. The embedded font
+programs differ on purpose: ReportRenderer leaves out the hinting tables.
+
+    python benchmarks/bench_pdf.py [--reports 500] [--workers 4]
+
+With --workers, the same reports are also rendered through a RenderPool.
+The feedback mixes in non-ASCII text (Romanian and Latvian letters,
+superscripts, soft hyphens, typographic punctuation), and one report with
+every character of pdf_renderer.COMMON_RANGES must render; the run fails
+if it does not.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_renderer
+from datetime import datetime
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+from pdf_renderer import ReportRenderer
+from render_pool import RenderPool
+from synthetic_mte import sentence
+
+SECTIONS = [
+    "academic_progress", "co-curricular", "financial_needs", "difficulties", "exam_results",
+    "books_and_videos", "health", "learning_from_people", "essay", "action_plan",
+]
+STREAM = re.compile(rb"stream\n(.*?)\nendstream", re.S)
+TRUETYPE = b"\x00\x01\x00\x00"
+NON_ASCII = [
+    "Ionuț Ștefan", "Ģirts Ķēniņš", "x² + y³ = z¹", "co\u00adoperation", "naïve café",
+    "“quoted” – dash…", "₹ 5,000 / € 60", "Ŗīga, Ļaudona", "ȷ ŀ ŉ",
+]
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2025, 5, 1, 9, 30, 0, tzinfo=tz)
+
+
+def legacy_generate_pdf(feedback):
+    """
+    The per-call renderer that ReportRenderer replaced, kept verbatim
+    (minus the file write) as the reference for timing and output.
+    """
+    # Extract relevant data
+    section_scores = feedback.get("section_scores", {})
+    strengths = feedback.get("strengths", [])
+    areas_for_improvement = feedback.get("areas_for_improvement", [])
+    suggestions = feedback.get("suggestions", [])
+
+    # Metadata
+    student_name = feedback.get("student_name", "N/A")
+    submission_month = feedback.get("submission_month", "N/A")
+    college_name = feedback.get("college_name", "N/A")
+    student_class = feedback.get("class_info", "N/A")
+    generation_date = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+
+    # Initialize PDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+
+    font_path = 'fonts/DejaVuSans.ttf'
+    font_path_bold = 'fonts/DejaVuSans-Bold.ttf'
+    if not os.path.exists(font_path):
+        print(f"Font file not found at {font_path}.")
+        return
+    pdf.add_font('DejaVu', '', font_path)
+    pdf.add_font('DejaVu', 'B', font_path_bold)
+    pdf.set_font('DejaVu', '', 16)
+
+    # Title
+    pdf.cell(0, 10, "MTE Evaluation Report", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    pdf.ln(10)
+    pdf.set_font("DejaVu", '', 12)
+
+    # Student details
+    student_details = [
+        f"Name of the Student: {student_name}",
+        f"Submission Month: {submission_month}",
+        f"College Name: {college_name}",
+        f"Class: {student_class}",
+        f"PDF Generated On: {generation_date}"
+    ]
+    for line in student_details:
+        pdf.multi_cell(0, 8, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    pdf.ln(5)
+
+    # Utility function for bullets
+    def add_bullet_section(title, items):
+        if not items:
+            return
+        pdf.set_font("DejaVu", 'B', 12)
+        pdf.cell(0, 10, f"{title}:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_font("DejaVu", '', 12)
+        for item in items:
+            if max((len(w) for w in item.split()), default=0) > 80:
+                pdf.set_font("DejaVu", '', 10)
+                pdf.multi_cell(0, 8, f"• {item}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                pdf.set_font("DejaVu", '', 12)
+            else:
+                pdf.multi_cell(0, 8, f"• {item}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.ln(3)
+
+    # Add bullet sections
+    add_bullet_section("Strengths", strengths)
+    add_bullet_section("Areas for Improvement", areas_for_improvement)
+    add_bullet_section("Suggestions", suggestions)
+
+    # Section-wise Scores
+    if section_scores:
+        pdf.set_font("DejaVu", 'B', 12)
+        pdf.cell(0, 10, "Section-wise Evaluation:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_font("DejaVu", '', 12)
+        pdf.ln(3)
+        for section, details in section_scores.items():
+            section_title = section.replace("_", " ").title()
+            pdf.set_font("DejaVu", 'B', 12)
+            pdf.cell(0, 10, f"{section_title} (Score: {details['score']})", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.set_font("DejaVu", '', 12)
+            lines = [
+                f"• Reason: {details['reason']}",
+                f"• Feedback: {details['feedback']}",
+                f"• Suggestions: {details['suggestions']}"
+            ]
+            for line in lines:
+                if not line.strip():
+                    continue
+                if max((len(word) for word in line.split()), default=0) > 80:
+                    pdf.set_font("DejaVu", '', 10)
+                    pdf.multi_cell(0, 8, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                    pdf.set_font("DejaVu", '', 12)
+                else:
+                    pdf.multi_cell(0, 8, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.ln(3)
+
+    return bytes(pdf.output())
+
+
+def page_content(pdf_bytes):
+    """
+    The decompressed streams of a PDF other than embedded TrueType fonts:
+    page content, ToUnicode maps and the like.
+    """
+    streams = []
+    for raw in STREAM.findall(pdf_bytes):
+        try:
+            data = zlib.decompress(raw)
+        except zlib.error:
+            data = raw
+        if not data.startswith(TRUETYPE):
+            streams.append(data)
+    return streams
+
+
+def synthetic_feedback(seed):
+    rng = random.Random(seed)
+    names = ["Aarav", "Diya", "Kabir", "Meera", "Rohan", "Saanvi", "Zoë", "Łukasz", "Ionuț", "Ģirts"]
+    return {
+        "student_name": f"{rng.choice(names)} {seed}",
+        "submission_month": "May , 2025",
+        "college_name": f"Institute {seed % 7}",
+        "class_info": str(1 + seed % 4),
+        "overall_score": rng.randint(4, 9),
+        "strengths": [sentence(rng, rng.randint(8, 20)) for _ in range(2)] + [
+            f"{sentence(rng, rng.randint(4, 10))} {rng.choice(NON_ASCII)}"
+        ],
+        "areas_for_improvement": [sentence(rng, rng.randint(8, 20)) for _ in range(3)],
+        "suggestions": [sentence(rng, rng.randint(8, 20)) for _ in range(3)],
+        "section_scores": {
+            key: {
+                "score": rng.randint(3, 10),
+                "reason": f"{sentence(rng, rng.randint(10, 25))} {rng.choice(NON_ASCII)}",
+                "feedback": sentence(rng, rng.randint(10, 25)),
+                "suggestions": sentence(rng, rng.randint(10, 25)),
+            }
+            for key in SECTIONS
+        },
+    }
+
+
+def common_range_feedback(renderer):
+    """
+    A report using every character of COMMON_RANGES that DejaVu has.
+    """
+    cmap = renderer._fonts[''].cmap
+    text = "".join(
+        chr(codepoint) for low, high in pdf_renderer.COMMON_RANGES for codepoint in range(low, high + 1)
+        if codepoint in cmap and chr(codepoint).isprintable()
+    )
+    lines = [text[start:start + 60] for start in range(0, len(text), 60)]
+    return {"student_name": lines[0], "strengths": lines, "section_scores": {}}
+
+
+def run(render, reports):
+    sizes = []
+    started = time.perf_counter()
+    for seed in range(reports):
+        sizes.append(len(render(synthetic_feedback(seed))))
+    return time.perf_counter() - started, sum(sizes) / len(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=0, help="also render through a RenderPool of this size")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    renderer = ReportRenderer()
+    setup = time.perf_counter() - started
+
+    try:
+        renderer.render(common_range_feedback(renderer))
+    except Exception as e:
+        print(f"FAIL: a report with every COMMON_RANGES character does not render: {e}")
+        return 1
+
+    legacy_time, legacy_size = run(legacy_generate_pdf, args.reports)
+    current_time, current_size = run(renderer.render, args.reports)
+
+    pool_time = None
+    if args.workers:
+        with RenderPool(workers=args.workers) as pool:
+            list(pool.map(synthetic_feedback(seed) for seed in range(args.workers)))  # warm up
+            started = time.perf_counter()
+            pool_sizes = [len(pdf) for pdf in pool.map(synthetic_feedback(seed) for seed in range(args.reports))]
+            pool_time = time.perf_counter() - started
+
+    # Same page content once the report date is pinned
+    globals()["datetime"] = pdf_renderer.datetime = FrozenDatetime
+    mismatches = sum(
+        page_content(legacy_generate_pdf(feedback)) != page_content(renderer.render(feedback))
+        for feedback in map(synthetic_feedback, range(min(args.reports, 20)))
+    )
+
+    print(f"{'renderer':<16}{'total':>10}{'per report':>14}{'avg size':>12}")
+    print(f"{'legacy':<16}{legacy_time:>9.2f}s{legacy_time / args.reports * 1000:>12.1f}ms{legacy_size / 1024:>10.1f}KB")
+    print(f"{'ReportRenderer':<16}{current_time:>9.2f}s{current_time / args.reports * 1000:>12.1f}ms{current_size / 1024:>10.1f}KB")
+    if pool_time is not None:
+        label = f"RenderPool x{args.workers}"
+        print(f"{label:<16}{pool_time:>9.2f}s{pool_time / args.reports * 1000:>12.1f}ms"
+              f"{sum(pool_sizes) / len(pool_sizes) / 1024:>10.1f}KB")
+    print(f"font setup {setup * 1000:.0f}ms (once), speedup {legacy_time / current_time:.1f}x, "
+          f"page content {'identical' if not mismatches else f'DIFFERS in {mismatches} reports'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+# benchmarks/bench_prompt.py
+"""
+Prompt size of synthetic MTE submissions, from a typical one to a pasted
+5,000-word essay and long tables: tokens of the raw section text, of the
+prompt build_prompt sends and of the rate-limiter reservation, plus the
+sections that PROMPT_BUDGET cut down and the time to build the prompt.
+Tokens are counted with prompt_budget.count_tokens, so the numbers use
+tiktoken when it is installed and the local estimate otherwise.
+
+It also checks that a long essay pasted between short table rows is
+shortened, not dropped: truncation must keep the rows around it and use
+most of the section budget. The run fails if it does not.
+
+    python benchmarks/bench_prompt.py [--repeat 20]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_mte import build_xlsx_bytes, sentence
+from config import PROMPT_BUDGET
+from evaluator import SECTION_KEYS, build_prompt, estimate_tokens
+from prompt_budget import _encoding, count_tokens, fit_sections, truncate_to_tokens
+from utils import extract_mte_data
+
+CASES = {
+    "typical": dict(),
+    "long tables": dict(rows_per_section=40),
+    "5000-word essay": dict(essay_words=5000),
+    "both": dict(rows_per_section=40, essay_words=5000),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Token counts via {'tiktoken' if _encoding() else 'local estimate'}")
+    print(f"{'submission':<18} {'raw':>7} {'system':>7} {'user':>7} {'reserved':>9} {'build':>9}  truncated")
+    for label, kwargs in CASES.items():
+        mte_data = extract_mte_data(io.BytesIO(build_xlsx_bytes(seed=1, **kwargs)))
+        raw = sum(count_tokens(str(mte_data.get(key, ""))) for key in SECTION_KEYS)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            messages = build_prompt(mte_data)
+        build_ms = (time.perf_counter() - started) / args.repeat * 1000
+        _, truncated = fit_sections(mte_data, SECTION_KEYS)
+        system, user = (count_tokens(message["content"]) for message in messages)
+        print(f"{label:<18} {raw:>7} {system:>7} {user:>7} {estimate_tokens(messages):>9} {build_ms:7.1f} ms  "
+              f"{', '.join(truncated) or '-'}")
+
+    return 0 if check_essay_between_rows() else 1
+
+
+def check_essay_between_rows(min_share=0.75):
+    """
+    Truncates "Topic | ... / <essay> / Word count | ..." to the section
+    budget; the essay must survive in part and fill at least min_share of it.
+    """
+    rng = random.Random(0)
+    essay = " ".join(sentence(rng) for _ in range(800))
+    text = f"Topic | My month\n{essay}\nWord count | {len(essay.split())}"
+    budget = PROMPT_BUDGET["section_tokens"]
+    shortened = truncate_to_tokens(text, budget)
+    kept = count_tokens(shortened)
+    print(f"\nEssay between short rows: {count_tokens(essay)} tokens cut to {kept} (budget {budget})")
+    lines = shortened.split("\n")
+    failures = []
+    if not (lines[0].startswith("Topic") and lines[-1].startswith("Word count")):
+        failures.append("the short rows around the essay were not kept")
+    if kept > budget:
+        failures.append(f"{kept} tokens exceed the budget")
+    if kept < budget * min_share:
+        failures.append(f"only {kept / budget:.0%} of the budget used, the essay was dropped")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return not failures
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,229 @@
+# benchmarks/fake_google.py
+"""
+In-memory stand-ins for the Gmail and Drive API clients, covering the calls
+gmail_integration.py makes (message listing, batched gets, attachments,
+batchModify, labels, send; folder search/listing, folder creation and
+uploads). Every execute() sleeps for the configured per-call latency, and
+a batch request costs one round trip, as it does against Google.
+"""
+import base64
+import itertools
+import re
+import threading
+import time
+
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+
+class FakeRequest:
+    def __init__(self, api, fn):
+        self.api = api
+        self.fn = fn
+
+    def execute(self):
+        self.api.round_trip()
+        return self.fn()
+
+
+class FakeBatch:
+    def __init__(self, api, callback):
+        self.api = api
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.api.round_trip()
+        for request_id, request in self.requests:
+            try:
+                response = request.fn()
+            except Exception as e:
+                self.callback(request_id, None, e)
+            else:
+                self.callback(request_id, response, None)
+
+
+class FakeApi:
+    """
+    Shared plumbing: a lock around the state, ID generation, call counts
+    and per-call latency.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.calls = 0
+
+    def new_id(self, prefix):
+        return f"{prefix}{next(self.ids):06d}"
+
+    def round_trip(self):
+        with self.lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def request(self, fn):
+        return FakeRequest(self, fn)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+
+class FakeGmail(FakeApi):
+    """
+    A mailbox of unread messages, each with one .xlsx attachment.
+    """
+
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.mailbox = {}
+        self.label_ids = {}
+        self.sent = []
+
+    def add_submission(self, sender, cc, subject, filename, data):
+        msg_id = self.new_id("msg")
+        headers = [{"name": "From", "value": sender}, {"name": "Subject", "value": subject}]
+        if cc:
+            headers.append({"name": "Cc", "value": cc})
+        self.mailbox[msg_id] = {
+            "labelIds": {"INBOX", "UNREAD"},
+            "payload": {
+                "mimeType": "multipart/mixed",
+                "headers": headers,
+                "parts": [
+                    {"mimeType": "text/plain", "filename": "", "body": {"size": 0}},
+                    {"mimeType": XLSX_MIME, "filename": filename,
+                     "body": {"attachmentId": f"att-{msg_id}", "size": len(data)}},
+                ],
+            },
+            "attachment": data,
+        }
+        return msg_id
+
+    # users() returns self, so service.users().messages() etc. resolve here
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def attachments(self):
+        return _Attachments(self)
+
+    def labels(self):
+        return _Labels(self)
+
+    def list(self, userId=None, labelIds=None, q="", maxResults=100, pageToken=None, **kwargs):
+        def run():
+            with self.lock:
+                excluded = {self.label_ids[name] for name in re.findall(r"-label:(\S+)", q or "") if name in self.label_ids}
+                matching = [
+                    msg_id for msg_id, message in self.mailbox.items()
+                    if set(labelIds or []) <= message["labelIds"]
+                    and ("is:unread" not in (q or "") or "UNREAD" in message["labelIds"])
+                    and not excluded & message["labelIds"]
+                ]
+            start = int(pageToken or 0)
+            page = matching[start:start + maxResults]
+            response = {"messages": [{"id": msg_id, "threadId": msg_id} for msg_id in page]}
+            if start + maxResults < len(matching):
+                response["nextPageToken"] = str(start + maxResults)
+            return response
+        return self.request(run)
+
+    def get(self, userId=None, id=None, **kwargs):
+        def run():
+            message = self.mailbox[id]
+            return {"id": id, "threadId": id, "payload": message["payload"]}
+        return self.request(run)
+
+    def batchModify(self, userId=None, body=None):
+        def run():
+            with self.lock:
+                for msg_id in body["ids"]:
+                    labels = self.mailbox[msg_id]["labelIds"]
+                    labels -= set(body.get("removeLabelIds", []))
+                    labels |= set(body.get("addLabelIds", []))
+        return self.request(run)
+
+    def send(self, userId=None, body=None):
+        def run():
+            with self.lock:
+                self.sent.append(len(body["raw"]))
+            return {"id": self.new_id("sent")}
+        return self.request(run)
+
+
+class _Attachments:
+    def __init__(self, gmail):
+        self.gmail = gmail
+
+    def get(self, userId=None, messageId=None, id=None):
+        def run():
+            data = self.gmail.mailbox[messageId]["attachment"]
+            return {"size": len(data), "data": base64.urlsafe_b64encode(data).decode()}
+        return self.gmail.request(run)
+
+
+class _Labels:
+    def __init__(self, gmail):
+        self.gmail = gmail
+
+    def list(self, userId=None):
+        def run():
+            with self.gmail.lock:
+                return {"labels": [{"id": label_id, "name": name} for name, label_id in self.gmail.label_ids.items()]}
+        return self.gmail.request(run)
+
+    def create(self, userId=None, body=None):
+        def run():
+            with self.gmail.lock:
+                label_id = self.gmail.label_ids.setdefault(body["name"], self.gmail.new_id("Label_"))
+            return {"id": label_id, "name": body["name"]}
+        return self.gmail.request(run)
+
+
+class FakeDrive(FakeApi):
+    """
+    A Drive with folders and uploaded files, matched on the query shapes
+    gmail_integration.py sends.
+    """
+
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.folders = {}
+        self.uploads = []
+
+    def files(self):
+        return self
+
+    def list(self, q="", pageToken=None, **kwargs):
+        def run():
+            name = re.search(r"name='([^']*)'", q)
+            parent = re.search(r"'([^']*)' in parents", q)
+            with self.lock:
+                files = [
+                    {"id": folder_id, "name": folder_name}
+                    for (folder_parent, folder_name), folder_id in self.folders.items()
+                    if (name is None or folder_name == name.group(1))
+                    and (parent is None or folder_parent == parent.group(1))
+                ]
+            return {"files": files}
+        return self.request(run)
+
+    def create(self, body=None, media_body=None, fields=None):
+        def run():
+            parent = (body.get("parents") or [None])[0]
+            with self.lock:
+                if body.get("mimeType") == FOLDER_MIME:
+                    folder_id = self.folders.setdefault((parent, body["name"]), self.new_id("folder"))
+                    return {"id": folder_id}
+                size = media_body.size() if media_body is not None else 0
+                self.uploads.append((parent, body["name"], size))
+                return {"id": self.new_id("file")}
+        return self.request(run)
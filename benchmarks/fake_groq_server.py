@@ -0,0 +1,321 @@
+# benchmarks/fake_groq_server.py
+"""
+Local stand-in for the Groq API, for exercising the evaluator without a key
+or quota. Every request gets a deterministic fake feedback JSON.
+
+Batch API (files and batches endpoints, used by groq_batch.py): a batch
+completes `delay` seconds after it is created, and `error_rate` of its
+requests fail.
+
+Chat completions (plain and streamed): each request takes about
+`chat_latency` seconds (normally distributed with `chat_jitter`),
+`rate_limit_rate` of them are answered at once with a 429 and a retry-after
+header, and `chat_error_rate` fail with a 500 after the latency.
+
+    python benchmarks/fake_groq_server.py --port 8765 --delay 5 --chat-latency 2
+    # then set GROQ_BATCH["base_url"] = "http://127.0.0.1:8765",
+    # or GROQ_BASE_URL=http://127.0.0.1:8765 for the chat client
+
+In-process use: server = start_server(port=0); server.base_url; server.shutdown()
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECTION_KEYS = [
+    "academic_progress", "co-curricular", "financial_needs", "difficulties", "exam_results",
+    "books_and_videos", "health", "learning_from_people", "essay", "action_plan",
+]
+
+
+def fake_feedback(body):
+    """
+    A model-shaped answer (reasoning block plus JSON) derived from the prompt.
+    """
+    rng = random.Random(hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest())
+    section_scores = {
+        key: {
+            "score": rng.randint(3, 10),
+            "reason": "Fake reason.",
+            "feedback": "Fake feedback.",
+            "suggestions": "Fake suggestions."
+        }
+        for key in SECTION_KEYS
+    }
+    feedback = {
+        "overall_score": round(sum(s["score"] for s in section_scores.values()) / len(section_scores)),
+        "section_scores": section_scores,
+        "strengths": ["Fake strength."],
+        "areas_for_improvement": ["Fake area."],
+        "suggestions": ["Fake suggestion."]
+    }
+    return "<think>Scoring each section against the rubric.</think>\n" + json.dumps(feedback)
+
+
+class FakeGroq:
+    def __init__(self, delay=2.0, error_rate=0.0, seed=0, chat_latency=0.0, chat_jitter=0.0,
+                 chat_error_rate=0.0, rate_limit_rate=0.0, retry_after=1.0):
+        self.delay = delay
+        self.error_rate = error_rate
+        self.chat_latency = chat_latency
+        self.chat_jitter = chat_jitter
+        self.chat_error_rate = chat_error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.files = {}
+        self.batches = {}
+        self.chat_counts = {"requests": 0, "ok": 0, "rate_limited": 0, "failed": 0}
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+    def new_id(self, prefix):
+        return f"{prefix}_{next(self.ids):06d}"
+
+    def add_file(self, data):
+        with self.lock:
+            file_id = self.new_id("file")
+            self.files[file_id] = data
+        return {"id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+                "filename": "batch.jsonl", "purpose": "batch"}
+
+    def create_batch(self, request):
+        with self.lock:
+            batch_id = self.new_id("batch")
+            lines = [line for line in self.files[request["input_file_id"]].decode().splitlines() if line.strip()]
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": request["endpoint"],
+                "input_file_id": request["input_file_id"],
+                "completion_window": request["completion_window"],
+                "status": "in_progress",
+                "created_at": int(time.time()),
+                "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+                "output_file_id": None,
+                "error_file_id": None,
+                "_started": time.monotonic(),
+            }
+            return self._public(self.batches[batch_id])
+
+    def retrieve_batch(self, batch_id):
+        with self.lock:
+            batch = self.batches[batch_id]
+            if batch["status"] == "in_progress" and time.monotonic() - batch["_started"] >= self.delay:
+                self._complete(batch)
+            return self._public(batch)
+
+    def _complete(self, batch):
+        outputs, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode().splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            result = {"id": self.new_id("batch_req"), "custom_id": request["custom_id"]}
+            if self.rng.random() < self.error_rate:
+                result.update(response={"status_code": 500, "body": {"error": {"message": "Fake failure."}}}, error=None)
+                errors.append(result)
+                continue
+            result.update(response={"status_code": 200, "body": {
+                "id": self.new_id("chatcmpl"),
+                "object": "chat.completion",
+                "model": request["body"]["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": fake_feedback(request["body"])}}],
+                "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500}
+            }}, error=None)
+            outputs.append(result)
+        for results, field in ((outputs, "output_file_id"), (errors, "error_file_id")):
+            if results:
+                file_id = self.new_id("file")
+                self.files[file_id] = ("\n".join(json.dumps(r) for r in results) + "\n").encode()
+                batch[field] = file_id
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+        batch["request_counts"].update(completed=len(outputs), failed=len(errors))
+
+    def chat_outcome(self):
+        """
+        Draws (latency seconds, outcome) for one chat request, where outcome
+        is "ok", "rate_limited" or "failed".
+        """
+        with self.lock:
+            latency = self.chat_latency
+            if self.chat_jitter:
+                latency = max(0.0, self.rng.gauss(self.chat_latency, self.chat_jitter))
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                outcome, latency = "rate_limited", 0.0
+            elif roll < self.rate_limit_rate + self.chat_error_rate:
+                outcome = "failed"
+            else:
+                outcome = "ok"
+            self.chat_counts["requests"] += 1
+            self.chat_counts[outcome] += 1
+        return latency, outcome
+
+    def chat_completion(self, request):
+        return {
+            "id": self.new_id("chatcmpl"),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": fake_feedback(request)}}],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500}
+        }
+
+    def chat_chunks(self, request, pieces=16):
+        """
+        The same answer as chat_completion, split into streaming chunks.
+        """
+        chunk_id = self.new_id("chatcmpl")
+        content = fake_feedback(request)
+        size = max(1, len(content) // pieces + 1)
+        for start in range(0, len(content), size):
+            yield {
+                "id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": request["model"],
+                "choices": [{"index": 0, "delta": {"content": content[start:start + size]}, "finish_reason": None}]
+            }
+        yield {
+            "id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": request["model"], "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+        }
+
+    @staticmethod
+    def _public(batch):
+        return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, payload, status=200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def read_body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def do_POST(self):
+            if self.path == "/openai/v1/files":
+                message = BytesParser(policy=HTTP).parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + self.read_body()
+                )
+                for part in message.iter_parts():
+                    if part.get_param("name", header="content-disposition") == "file":
+                        return self.send_json(state.add_file(part.get_payload(decode=True)))
+                return self.send_json({"error": {"message": "No file part."}}, 400)
+            if self.path == "/openai/v1/batches":
+                return self.send_json(state.create_batch(json.loads(self.read_body())))
+            if self.path == "/openai/v1/chat/completions":
+                return self.chat(json.loads(self.read_body()))
+            self.send_json({"error": {"message": "Not found."}}, 404)
+
+        def chat(self, request):
+            latency, outcome = state.chat_outcome()
+            if outcome == "rate_limited":
+                body = json.dumps({"error": {"message": "Fake rate limit.", "type": "tokens"}}).encode()
+                self.send_response(429)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("retry-after", str(state.retry_after))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if not request.get("stream"):
+                time.sleep(latency)
+                if outcome == "failed":
+                    return self.send_json({"error": {"message": "Fake failure."}}, 500)
+                return self.send_json(state.chat_completion(request))
+
+            # Streamed: the first token after ~30% of the latency, the rest spread out
+            time.sleep(latency * 0.3)
+            if outcome == "failed":
+                return self.send_json({"error": {"message": "Fake failure."}}, 500)
+            chunks = list(state.chat_chunks(request))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            try:
+                for chunk in chunks:
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(latency * 0.7 / len(chunks))
+                self.wfile.write(b"data: [DONE]\n\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client closes the stream once the JSON object is complete
+                pass
+
+        def do_GET(self):
+            match = re.fullmatch(r"/openai/v1/batches/([\w-]+)", self.path)
+            if match and match.group(1) in state.batches:
+                return self.send_json(state.retrieve_batch(match.group(1)))
+            match = re.fullmatch(r"/openai/v1/files/([\w-]+)/content", self.path)
+            if match and match.group(1) in state.files:
+                data = state.files[match.group(1)]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            self.send_json({"error": {"message": "Not found."}}, 404)
+
+    return Handler
+
+
+def start_server(host="127.0.0.1", port=0, delay=2.0, error_rate=0.0, **chat_profile):
+    """
+    Serves on a background thread and returns the server; its base_url
+    attribute is ready to use as a Groq base_url, and its state attribute
+    is the FakeGroq behind it. chat_profile takes the chat_* keyword
+    arguments of FakeGroq.
+    """
+    state = FakeGroq(delay, error_rate, **chat_profile)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=2.0, help="seconds until a batch completes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of batch requests that fail")
+    parser.add_argument("--chat-latency", type=float, default=0.0, help="mean seconds per chat completion")
+    parser.add_argument("--chat-jitter", type=float, default=0.0, help="standard deviation of the chat latency")
+    parser.add_argument("--chat-error-rate", type=float, default=0.0, help="fraction of chat requests that fail")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of chat requests answered with 429")
+    args = parser.parse_args()
+    state = FakeGroq(args.delay, args.error_rate, chat_latency=args.chat_latency, chat_jitter=args.chat_jitter,
+                     chat_error_rate=args.chat_error_rate, rate_limit_rate=args.rate_limit_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"Fake Groq API on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# benchmarks/parity_extract.py
+"""
+Parity suite for the workbook parsers: every case must give the same dict
+from the previous full-load extractor, the openpyxl read-only backend and
+the OOXML backend. Extra .xlsx files (e.g. real submissions) can be passed
+on the command line. Exits with status 1 on any mismatch.
+
+    python benchmarks/parity_extract.py [submission.xlsx ...]
+"""
+import io
+import os
+import re
+import sys
+import zipfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl.cell.rich_text import CellRichText, TextBlock
+from openpyxl.cell.text import InlineFont
+from openpyxl.styles import Border
+from bench_extract import legacy_extract_mte_data
+from synthetic_mte import BOX, build_workbook
+from utils import extract_mte_data
+
+
+def save(workbook):
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def rewrite_package(data, rewrite):
+    """
+    Returns a copy of the .xlsx bytes after rewrite(parts) has edited the
+    {part name: text} dict in place.
+    """
+    source = zipfile.ZipFile(io.BytesIO(data))
+    parts = {name: source.read(name).decode() for name in source.namelist()}
+    rewrite(parts)
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as target:
+        for name, content in parts.items():
+            target.writestr(name, content.encode())
+    return output.getvalue()
+
+
+def case_shared_strings():
+    """
+    Moves every inline string into xl/sharedStrings.xml, as Excel saves them.
+    """
+    def rewrite(parts):
+        strings = []
+
+        def to_shared(match):
+            strings.append(match.group(3))
+            return f'<c r="{match.group(1)}"{match.group(2) or ""} t="s"><v>{len(strings) - 1}</v></c>'
+
+        parts["xl/worksheets/sheet1.xml"] = re.sub(
+            r'<c r="([A-Z]+[0-9]+)"( s="[0-9]+")? t="inlineStr"><is><t>(.*?)</t></is></c>',
+            to_shared, parts["xl/worksheets/sheet1.xml"]
+        )
+        items = "".join(f"<si><t>{text}</t></si>" for text in strings)
+        parts["xl/sharedStrings.xml"] = (
+            f'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'count="{len(strings)}" uniqueCount="{len(strings)}">{items}</sst>'
+        )
+        parts["xl/_rels/workbook.xml.rels"] = parts["xl/_rels/workbook.xml.rels"].replace(
+            "</Relationships>",
+            '<Relationship Id="rIdSst" Target="sharedStrings.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" /></Relationships>'
+        )
+        parts["[Content_Types].xml"] = parts["[Content_Types].xml"].replace(
+            "</Types>",
+            '<Override PartName="/xl/sharedStrings.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml" /></Types>'
+        )
+    return rewrite_package(save(build_workbook(seed=11, padding_rows=50, padding_cols=5)), rewrite)
+
+
+def case_no_coordinates():
+    def rewrite(parts):
+        parts["xl/worksheets/sheet1.xml"] = re.sub(r'<c r="[A-Z]+[0-9]+"', "<c", parts["xl/worksheets/sheet1.xml"], count=5)
+    return rewrite_package(save(build_workbook(seed=12)), rewrite)
+
+
+def case_mixed_values():
+    workbook = build_workbook(seed=13)
+    sheet = workbook.active
+    sheet.cell(8, 3, 42)
+    sheet.cell(9, 3, True)
+    sheet.cell(10, 3, date(2025, 5, 1))
+    sheet.cell(11, 2, CellRichText(["Rich ", TextBlock(InlineFont(b=True), "bold"), " text"]))
+    sheet.cell(12, 2, "Ligature ﬁle and café with line_x000D_break & <tags>")
+    return save(workbook)
+
+
+def case_formulas():
+    workbook = build_workbook(seed=14)
+    workbook.active.cell(8, 3, "=1+1")
+    return save(workbook)
+
+
+def case_touching_tables():
+    workbook = build_workbook(seed=15)
+    sheet = workbook.active
+    # A bordered block bridging two sections turns them into one table
+    for row in range(6, 14):
+        sheet.cell(row, 6).border = BOX
+    return save(workbook)
+
+
+def case_partial_borders():
+    workbook = build_workbook(seed=16, columns=4)
+    sheet = workbook.active
+    for row in range(30, 40):
+        sheet.cell(row, 9, f"Loose note {row}").border = BOX if row % 3 else Border(left=BOX.left)
+    return save(workbook)
+
+
+CASES = {
+    **{f"synthetic seed {seed}": (lambda seed=seed: save(build_workbook(seed=seed))) for seed in range(5)},
+    "padded template": lambda: save(build_workbook(seed=5, padding_rows=400, padding_cols=12)),
+    "wide tables": lambda: save(build_workbook(seed=6, columns=7, rows_per_section=8)),
+    "shared strings": case_shared_strings,
+    "cells without coordinates": case_no_coordinates,
+    "numbers, dates and rich text": case_mixed_values,
+    "formula cells": case_formulas,
+    "touching tables": case_touching_tables,
+    "partial borders": case_partial_borders,
+}
+
+
+def check(name, data):
+    reference = legacy_extract_mte_data(io.BytesIO(data))
+    results = {
+        "openpyxl": extract_mte_data(io.BytesIO(data), backend="openpyxl"),
+        "ooxml": extract_mte_data(io.BytesIO(data), backend="ooxml"),
+    }
+    failures = [backend for backend, result in results.items() if result != reference]
+    print(f"{'FAIL' if failures else 'ok  '}  {name}" + (f"  ({', '.join(failures)} differ)" if failures else ""))
+    for backend in failures:
+        for key in reference:
+            if results[backend].get(key) != reference[key]:
+                print(f"        {backend}.{key}: {results[backend].get(key)!r:.80} != {reference[key]!r:.80}")
+    return not failures
+
+
+def main():
+    passed = True
+    for name, build in CASES.items():
+        passed &= check(name, build())
+    for path in sys.argv[1:]:
+        with open(path, "rb") as file:
+            passed &= check(path, file.read())
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
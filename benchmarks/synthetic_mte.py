@@ -0,0 +1,79 @@
+# benchmarks/synthetic_mte.py
+"""
+Generates synthetic MTE workbooks in the layout extract_mte_data expects:
+student line in B2, college line in B4, then one bordered table per section
+with a merged heading row. Optional padding adds formatted empty cells, as
+found in templates that were copied around in Excel.
+"""
+import io
+import random
+from openpyxl import Workbook
+from openpyxl.styles import Border, PatternFill, Side
+
+SECTION_HEADINGS = [
+    "Academic Progress / Vacation Plan",
+    "Co and Extra Curricular Progress-Plan",
+    "Fin Reqm for the next 3 months (Details Please)",
+    "Difficulties (Social, Family, etc.)",
+    "Results of the exams",
+    "Reading Books / Watching Videos",
+    "Did you exercise regularly and eat and sleep well?",
+    "Learnings from friends or acquaintances made",
+    "Essay on a topic of your choice",
+    "Action Plan for the coming month",
+]
+
+WORDS = (
+    "study plan exam college project friends family library practice goal week "
+    "month reading video sleep exercise mentor scholarship semester lab notes"
+).split()
+
+THIN = Side(style="thin")
+BOX = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+PADDING_FILL = PatternFill("solid", fgColor="FFF2CC")
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def build_workbook(seed=0, rows_per_section=4, columns=3, padding_rows=0, padding_cols=0, essay_words=150):
+    """
+    Returns an openpyxl Workbook with one MTE submission.
+    """
+    rng = random.Random(seed)
+    workbook = Workbook()
+    sheet = workbook.active
+
+    sheet.cell(2, 2, f"Name of the Student: Student {seed} for the month of May")
+    sheet.cell(4, 2, f"College: Institute {seed % 7} ____ Year of Study: {1 + seed % 4}")
+
+    row = 6
+    for heading in SECTION_HEADINGS:
+        sheet.cell(row, 2, heading)
+        sheet.merge_cells(start_row=row, start_column=2, end_row=row, end_column=1 + columns)
+        for col in range(2, 2 + columns):
+            sheet.cell(row, col).border = BOX
+
+        body_rows = 1 if heading.startswith("Essay") else rows_per_section
+        for r in range(row + 1, row + 1 + body_rows):
+            for col in range(2, 2 + columns):
+                if heading.startswith("Essay") and col == 2:
+                    text = " ".join(sentence(rng) for _ in range(max(1, essay_words // 12)))
+                else:
+                    text = sentence(rng, rng.randint(3, 12))
+                cell = sheet.cell(r, col, text)
+                cell.border = BOX
+        row += body_rows + 2
+
+    # Formatted but empty cells to the right of and below the tables
+    for r in range(1, padding_rows + 1):
+        for col in range(columns + 3, columns + 3 + padding_cols):
+            sheet.cell(r, col).fill = PADDING_FILL
+    return workbook
+
+
+def build_xlsx_bytes(**kwargs):
+    buffer = io.BytesIO()
+    build_workbook(**kwargs).save(buffer)
+    return buffer.getvalue()
@@ -4,7 +4,7 @@ ENV = "local"  # ← Switch to "local" for personal Gmail testing
 
 CONFIG = {
     "local": {
-        "central_authority_email": " " # use your own mail id,
+        "central_authority_email": " ",  # use your own mail id
         "user_id": "me",  # Local Gmail alias
     },
     "production": {
@@ -13,5 +13,158 @@ CONFIG = {
     }
 }
 
+# Worker limits for the Gmail batch pipeline (pipeline.py).
+# "in_flight" caps how many messages are processed at once; every other key
+# is the pool size of one stage. I/O stages run on threads, the CPU stages
+# ("parse", "render") on processes. A limit of 0 runs that stage inline.
+PIPELINE_LIMITS = {
+    "in_flight": 16,
+    "gmail": 4,
+    "parse": 2,
+    "evaluate": 4,
+    "render": 2,
+    "drive": 4,
+}
+
+# Local JSON map of Drive folder IDs (MTE_Submissions and one folder per student)
+FOLDER_CACHE_PATH = "folder_cache.json"
+
+# Drive uploads below this size use a single multipart request instead of a
+# resumable session; each upload's size and time is traced as stage "upload"
+# in METRICS["trace_path"].
+UPLOAD_RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+
+# Stage instrumentation (metrics.py). Each stage call of the Gmail pipeline
+# (fetch, parse, evaluate, render, upload, send, mark) is appended to
+# trace_path as a JSON line with its duration, size and outcome; completions
+# add their token usage. textfile_path receives a Prometheus textfile summary
+# (duration histograms over buckets, byte and token counters) at the end of
+# each run. None turns either output off.
+METRICS = {
+    "trace_path": "metrics/trace.jsonl",
+    "textfile_path": "metrics/mte_pipeline.prom",
+    "buckets": (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+}
+
+# Socket timeout in seconds for Gmail and Drive API calls (google_services.py)
+GOOGLE_HTTP_TIMEOUT = 60
+
+# Attachments and reports are handled in memory. When enabled, a copy of
+# each is also archived under path, named by its SHA-256 (attachment_store.py).
+ATTACHMENT_STORE = {
+    "enabled": False,
+    "path": "attachment_store",
+}
+
+# SQLite ledger of the stages each Gmail submission has completed (ledger.py).
+# An interrupted run resumes from it without re-evaluating or re-sending.
+LEDGER_PATH = "processing_ledger.sqlite3"
 
+# Per-student feedback history written by save_feedback_to_json
+FEEDBACK_HISTORY_DIR = "data/history"
+
+# Long-running mode (gmail_watch.py). New mail is picked up incrementally with
+# users.history.list every poll_interval seconds, or as soon as a Pub/Sub push
+# notification reaches the local endpoint on push_port (None disables it;
+# push_token, if set, must be passed as ?token= on the push URL). A full
+# unread listing runs every full_sync_interval seconds to retry failures.
+# topic is the Pub/Sub topic registered with users.watch, renewed every
+# watch_renew_interval seconds; None leaves Gmail push unconfigured.
+GMAIL_WATCH = {
+    "poll_interval": 30.0,
+    "full_sync_interval": 3600.0,
+    "history_path": "gmail_history.json",
+    "push_host": "127.0.0.1",
+    "push_port": None,
+    "push_token": None,
+    "topic": None,
+    "watch_renew_interval": 24 * 3600.0,
+}
 
+# On-disk cache of evaluate_mte results, keyed on the submission content,
+# model and prompt version. Entries expire after ttl_seconds and the least
+# recently used ones are evicted beyond max_entries.
+EVALUATION_CACHE = {
+    "enabled": True,
+    "path": "evaluation_cache.sqlite3",
+    "ttl_seconds": 30 * 24 * 60 * 60,
+    "max_entries": 5000,
+}
+
+# Groq quota per model, enforced client-side by rate_limiter.ModelRateLimiter.
+# Set these to the limits shown for your account in the Groq console.
+MODEL_RATE_LIMITS = {
+    "deepseek-r1-distill-llama-70b": {"requests_per_minute": 30, "tokens_per_minute": 6000},
+    "meta-llama/llama-4-maverick-17b-128e-instruct": {"requests_per_minute": 30, "tokens_per_minute": 6000},
+}
+
+# Retries of failed Groq calls (429s, 5xx, timeouts). A retry-after header
+# wins over the exponential backoff. Requests sent by the model router
+# (MODEL_ROUTING["timeout"]) only retry 429s; on other errors the router
+# falls back to the next model straight away.
+GROQ_RETRY = {
+    "max_retries": 4,
+    "base_backoff": 1.0,
+    "max_backoff": 60.0,
+}
+
+# Model used by the Gmail pipeline; model_router falls back to the other
+# AVAILABLE_MODELS when it fails.
+DEFAULT_MODEL = "deepseek-r1-distill-llama-70b"
+
+# Routing between models (model_router.py). A hedged request to the fastest
+# other model is sent once the first one runs past its p95 latency
+# (default_hedge_after seconds until min_samples latencies are known).
+# With "stream" each completion is streamed and cut off once its JSON closes;
+# that happens before Groq's final usage chunk, so token counts in the metrics
+# are then estimates. Off by default: the router serves the headless Gmail
+# pipeline and batch CLI, which never use early section events, and a
+# non-streamed completion reports its real prompt/completion usage. The
+# Streamlit UI streams regardless (stream_evaluate_mte).
+MODEL_ROUTING = {
+    "hedge": True,
+    "stream": False,
+    "timeout": 120.0,
+    "default_hedge_after": 60.0,
+    "min_samples": 5,
+    "window": 200,
+    "max_workers": 16,
+}
+
+# "single" asks for all sections in one completion; "sectioned" sends one
+# short request per section plus a summary request, concurrently.
+EVALUATION_MODE = "single"
+
+SECTIONED_EVALUATION = {
+    "max_workers": 11,
+    "section_tokens": 600,
+    "summary_tokens": 800,
+    "part_retries": 2,
+}
+
+# Token budget for the student's text in evaluation prompts (prompt_budget.py).
+# Sections are compacted first (indentation, empty cells, repeated rows). If
+# the submission is still over submission_tokens, the sections above their
+# fair share are cut down to it, keeping their beginning and end; no section
+# gets more than section_tokens. Tokens are counted with tiktoken's encoding
+# when tiktoken is installed, otherwise estimated locally.
+PROMPT_BUDGET = {
+    "submission_tokens": 3000,
+    "section_tokens": 1200,
+    "encoding": "cl100k_base",
+}
+
+# Workbook parser used by extract_mte_data: "ooxml" streams the .xlsx XML
+# directly and falls back to openpyxl for unusual files; "openpyxl" always
+# uses openpyxl's read-only mode.
+EXTRACT_BACKEND = "ooxml"
+
+# Groq Batch API (groq_batch.py) for backfills that can wait: requests are
+# uploaded as one JSONL file and collected when the batch completes.
+# base_url points the batch client elsewhere, e.g. at a local mock server
+# (benchmarks/fake_groq_server.py); None uses the Groq API.
+GROQ_BATCH = {
+    "completion_window": "24h",
+    "poll_interval": 30.0,
+    "base_url": None,
+}
@@ -1,61 +1,523 @@
 # evaluator.py
-from groq import Groq
+import asyncio
 import json
 import re
-import streamlit as st
+import threading
 from utils import get_api_key_from_json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import EVALUATION_CACHE, EVALUATION_MODE, MODEL_RATE_LIMITS, GROQ_RETRY, SECTIONED_EVALUATION, PROMPT_BUDGET
+from rate_limiter import ModelRateLimiter
+from stream_parser import StreamingFeedbackParser
+from result_cache import ResultCache, make_key
+from metrics import get_metrics
+from prompt_budget import count_tokens, fit_sections, truncate_to_tokens
 
-client = Groq(api_key = get_api_key_from_json("GROQ_API_KEY"))
+rate_limiter = ModelRateLimiter(MODEL_RATE_LIMITS)
+_client = None
+_async_client = None
+# Guards the lazy singletons below: the pipeline's evaluate threads all ask for them on the first batch
+_singletons_lock = threading.Lock()
 
 AVAILABLE_MODELS = [
     "deepseek-r1-distill-llama-70b",
     "meta-llama/llama-4-maverick-17b-128e-instruct",
 ]
 
-def evaluate_mte(mte_data, selected_model):
+SECTION_KEYS = [
+    "academic_progress",
+    "co-curricular",
+    "financial_needs",
+    "difficulties",
+    "exam_results",
+    "books_and_videos",
+    "health",
+    "learning_from_people",
+    "essay",
+    "action_plan",
+]
+
+MAX_COMPLETION_TOKENS = 3000
+
+# Bump whenever build_prompt changes so cached results from the old prompt are not reused
+PROMPT_VERSION = "2"
+
+_result_cache = None
+
+def get_result_cache():
+    """
+    Returns the shared evaluation cache, or None if caching is disabled.
+    """
+    global _result_cache
+    with _singletons_lock:
+        if _result_cache is None and EVALUATION_CACHE["enabled"]:
+            _result_cache = ResultCache(
+                EVALUATION_CACHE["path"],
+                ttl_seconds=EVALUATION_CACHE["ttl_seconds"],
+                max_entries=EVALUATION_CACHE["max_entries"]
+            )
+        return _result_cache
+
+def get_client():
+    global _client
+    with _singletons_lock:
+        if _client is None:
+            from groq import Groq
+            # Retries are handled here so that they go through the rate limiter
+            _client = Groq(api_key = get_api_key_from_json("GROQ_API_KEY"), max_retries = 0)
+        return _client
+
+def get_async_client():
+    global _async_client
+    with _singletons_lock:
+        if _async_client is None:
+            from groq import AsyncGroq
+            _async_client = AsyncGroq(api_key = get_api_key_from_json("GROQ_API_KEY"), max_retries = 0)
+        return _async_client
+
+def evaluation_cache_key(mte_data, selected_model):
+    sections = {key: mte_data.get(key, "") for key in SECTION_KEYS}
+    return make_key(sections, selected_model, PROMPT_VERSION)
+
+def sectioned_part_key(mte_data, part):
+    """
+    Cache key of one finished part (a section key, or "summary") of a
+    sectioned evaluation. Not tied to the model, so a later attempt or a
+    fallback to another model only sends the parts that failed.
+    """
+    sections = {key: mte_data.get(key, "") for key in SECTION_KEYS}
+    return make_key(sections, "sectioned-part", part, PROMPT_VERSION)
+
+def cached_evaluation(mte_data, selected_model, mode=None):
+    """
+    Returns the cached feedback evaluate_mte would answer with, or None.
+    """
+    cache = get_result_cache()
+    if not cache:
+        return None
+    cache_key = evaluation_cache_key(mte_data, selected_model)
+    if (mode or EVALUATION_MODE) == "sectioned":
+        cache_key += ":sectioned"
+    return cache.get(cache_key)
+
+# Chat template tokens around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def estimate_tokens(messages, max_completion_tokens=MAX_COMPLETION_TOKENS):
+    """
+    Upper bound of the tokens a request will consume (the prompt, counted
+    locally, plus the full completion budget), used for rate limiting.
+    """
+    prompt_tokens = sum(count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+    return prompt_tokens + max_completion_tokens
+
+def retry_delay(error, attempt, rate_limits_only=False):
+    """
+    Returns how long to wait before retrying after error, or None if the
+    error is not worth retrying. Honors the retry-after header on 429s.
+    With rate_limits_only, timeouts, connection errors and 5xx are not
+    retried, so a caller with a fallback model can move on at once.
+    """
+    from groq import APIConnectionError, APIStatusError, APITimeoutError
+
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        if rate_limits_only:
+            return None
+        return min(GROQ_RETRY["max_backoff"], GROQ_RETRY["base_backoff"] * 2 ** attempt)
+    if isinstance(error, APIStatusError) and (
+        error.status_code == 429 or (error.status_code >= 500 and not rate_limits_only)
+    ):
+        retry_after = error.response.headers.get("retry-after")
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return min(GROQ_RETRY["max_backoff"], GROQ_RETRY["base_backoff"] * 2 ** attempt)
+    return None
+
+def _request_kwargs(messages, selected_model, max_completion_tokens=MAX_COMPLETION_TOKENS):
+    return {
+        "model": selected_model,
+        "messages": messages,
+        "max_completion_tokens": max_completion_tokens,
+        "temperature": 0.3,
+    }
+
+def _settle_usage(response, selected_model, reserved):
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        rate_limiter.settle(selected_model, reserved, usage.total_tokens)
+        get_metrics().add_tokens(selected_model, usage.prompt_tokens, usage.completion_tokens)
+
+def parse_feedback(output):
+    json_text = extract_json(output)
+    try:
+        return json.loads(json_text)
+    except json.JSONDecodeError:
+        # The caller decides how to show the unparsable output
+        return {"error": "Invalid JSON from model.", "raw_output": output}
+
+def _after_failure(error, attempt, selected_model, reserved, rate_limits_only=False):
+    """
+    Settles a failed call and backs the model off before the next attempt.
+    Re-raises error if it is not worth retrying or no attempts are left.
+    Shared by the sync and async retry loops.
+    """
+    # A failed call consumed no completion tokens
+    rate_limiter.settle(selected_model, reserved, 0)
+    delay = retry_delay(error, attempt, rate_limits_only)
+    if delay is None or attempt == GROQ_RETRY["max_retries"]:
+        raise error
+    rate_limiter.backoff(selected_model, delay)
+
+def _send_with_retries(send, selected_model, reserved, rate_limits_only=False):
+    """
+    Calls send() through the rate limiter, retrying retryable errors.
+    """
+    for attempt in range(GROQ_RETRY["max_retries"] + 1):
+        rate_limiter.acquire(selected_model, reserved)
+        try:
+            return send()
+        except Exception as e:
+            _after_failure(e, attempt, selected_model, reserved, rate_limits_only)
+
+async def _send_with_retries_async(send, selected_model, reserved, rate_limits_only=False):
+    """
+    Awaits send() through the rate limiter, retrying retryable errors.
+    """
+    for attempt in range(GROQ_RETRY["max_retries"] + 1):
+        await rate_limiter.acquire_async(selected_model, reserved)
+        try:
+            return await send()
+        except Exception as e:
+            _after_failure(e, attempt, selected_model, reserved, rate_limits_only)
+
+def _feedback_from_response(response, selected_model, reserved):
+    _settle_usage(response, selected_model, reserved)
+    return parse_feedback(response.choices[0].message.content.strip())
+
+def _create_completion(messages, selected_model, reserved, timeout=None, max_completion_tokens=MAX_COMPLETION_TOKENS, **kwargs):
+    """
+    Sends one chat completion through the rate limiter, retrying retryable errors.
+    A caller that passes a timeout (the model router) falls back to another
+    model itself, so then only 429s are retried here.
+    """
+    client = get_client()
+    request_client = client.with_options(timeout = timeout) if timeout else client
+    return _send_with_retries(
+        lambda: request_client.chat.completions.create(
+            **_request_kwargs(messages, selected_model, max_completion_tokens), **kwargs
+        ),
+        selected_model, reserved, rate_limits_only=bool(timeout)
+    )
+
+def evaluate_mte(mte_data, selected_model, refresh=False, timeout=None, stream=False, mode=None):
     """
     Evaluates the Monthly Thinking Exercise (MTE) based on student input data
     and generates structured feedback.
+
+    Identical submissions are answered from the on-disk result cache;
+    pass refresh=True to force a new evaluation. timeout (seconds) bounds
+    each request to Groq. With stream=True the completion is streamed and
+    the request is closed as soon as the JSON object is complete.
+    mode="sectioned" evaluates every section in its own request (see
+    evaluate_mte_sectioned); the default comes from EVALUATION_MODE.
     """
+    if (mode or EVALUATION_MODE) == "sectioned":
+        return evaluate_mte_sectioned(mte_data, selected_model, refresh=refresh, timeout=timeout)
+
+    if stream:
+        feedback_dict = {"error": "No response from model."}
+        for event in stream_evaluate_mte(mte_data, selected_model, refresh=refresh, timeout=timeout):
+            if event[0] == "done":
+                feedback_dict = event[1]
+        return feedback_dict
+
+    cache = get_result_cache()
+    cache_key = evaluation_cache_key(mte_data, selected_model)
+    if cache and not refresh:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
         messages = build_prompt(mte_data)
+        reserved = estimate_tokens(messages)
+        response = _create_completion(messages, selected_model, reserved, timeout)
+        feedback_dict = _feedback_from_response(response, selected_model, reserved)
+        if cache and "error" not in feedback_dict:
+            cache.set(cache_key, feedback_dict)
+        return feedback_dict
 
-        response = client.chat.completions.create(
-            model = selected_model,
-            messages = messages,
-            max_completion_tokens = 3000,
-            temperature = 0.3,
-        )
+    except Exception as e:
+        return {"error": str(e)}
 
-        output = response.choices[0].message.content.strip()
-        json_text = extract_json(output)
+def stream_evaluate_mte(mte_data, selected_model, refresh=False, timeout=None):
+    """
+    Streaming variant of evaluate_mte. Yields ("section", key, details) as
+    each entry of section_scores completes, then ("done", feedback_dict).
+    Reasoning blocks are skipped and the stream is closed once the JSON ends.
+    """
+    cache = get_result_cache()
+    cache_key = evaluation_cache_key(mte_data, selected_model)
+    if cache and not refresh:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            for section, details in cached.get("section_scores", {}).items():
+                yield ("section", section, details)
+            yield ("done", cached)
+            return
 
+    try:
+        messages = build_prompt(mte_data)
+        reserved = estimate_tokens(messages)
+        stream = _create_completion(messages, selected_model, reserved, timeout, stream=True)
+        parser = StreamingFeedbackParser()
+        feedback_dict = None
         try:
-            feedback_dict = json.loads(json_text)
-            return feedback_dict
-        except json.JSONDecodeError:
-            st.error("The model output could not be parsed as JSON. Output shown below:")
-            st.text_area("Output", output, height = 400)
-            return {"error": "Invalid JSON from model."}
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                for event in parser.feed(chunk.choices[0].delta.content or ""):
+                    if event[0] == "section":
+                        yield event
+                    else:
+                        feedback_dict = event[1]
+                if parser.done:
+                    break
+        finally:
+            stream.close()
+
+        output = parser.text()
+        # The stream is closed before its final usage chunk, so both counts are estimates
+        prompt_tokens = reserved - MAX_COMPLETION_TOKENS
+        completion_tokens = count_tokens(output)
+        rate_limiter.settle(selected_model, reserved, prompt_tokens + completion_tokens)
+        get_metrics().add_tokens(selected_model, prompt_tokens, completion_tokens, estimated=True)
+        if feedback_dict is None or "error" in feedback_dict:
+            feedback_dict = parse_feedback(output.strip())
+        if cache and "error" not in feedback_dict:
+            cache.set(cache_key, feedback_dict)
+        yield ("done", feedback_dict)
+
+    except Exception as e:
+        yield ("done", {"error": str(e)})
+
+def _complete_json(messages, selected_model, max_completion_tokens, timeout=None, score_key=None):
+    """
+    Runs one short completion and returns its parsed JSON object.
+    Raises ValueError if the output is not a JSON object, or if score_key
+    is given and the object has no numeric value for it.
+    """
+    reserved = estimate_tokens(messages, max_completion_tokens)
+    response = _create_completion(messages, selected_model, reserved, timeout, max_completion_tokens)
+    _settle_usage(response, selected_model, reserved)
+    output = response.choices[0].message.content.strip()
+    try:
+        result = json.loads(extract_json(output))
+    except json.JSONDecodeError:
+        raise ValueError("Invalid JSON from model.")
+    if not isinstance(result, dict):
+        raise ValueError("Model output is not a JSON object.")
+    score = result.get(score_key) if score_key else 0
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        raise ValueError(f'Model output has no numeric "{score_key}".')
+    return result
+
+def _complete_json_with_retries(messages, selected_model, max_completion_tokens, timeout=None, score_key=None):
+    """
+    Retries a part whose output is unusable. API errors are raised at once:
+    _create_completion has already retried those that are worth retrying.
+    """
+    attempts = SECTIONED_EVALUATION["part_retries"] + 1
+    for attempt in range(attempts):
+        try:
+            return _complete_json(messages, selected_model, max_completion_tokens, timeout, score_key)
+        except ValueError:
+            if attempt == attempts - 1:
+                raise
+
+def stream_evaluate_mte_sectioned(mte_data, selected_model, refresh=False, timeout=None):
+    """
+    Evaluates every section in its own concurrent request, plus one summary
+    request for the overall score, strengths, areas and suggestions.
+    Yields ("section", key, details) as sections finish, then ("done", feedback)
+    with the same schema as evaluate_mte. A failed part is retried on its own.
+    Finished parts are cached until the whole evaluation is, so after a
+    failure only the missing parts are requested again.
+    """
+    cache = get_result_cache()
+    cache_key = evaluation_cache_key(mte_data, selected_model) + ":sectioned"
+    if cache and not refresh:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            for section, details in cached.get("section_scores", {}).items():
+                yield ("section", section, details)
+            yield ("done", cached)
+            return
+
+    # None stands for the summary part
+    part_keys = {part: sectioned_part_key(mte_data, part or "summary") for part in SECTION_KEYS + [None]}
+    finished = {}
+    if cache and not refresh:
+        for part, key in part_keys.items():
+            cached_part = cache.get(key)
+            if cached_part is not None:
+                finished[part] = cached_part
+                if part is not None:
+                    yield ("section", part, cached_part)
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=SECTIONED_EVALUATION["max_workers"]) as executor:
+        futures = {
+            executor.submit(
+                _complete_json_with_retries, build_section_prompt(section, mte_data.get(section)),
+                selected_model, SECTIONED_EVALUATION["section_tokens"], timeout, "score"
+            ): section
+            for section in SECTION_KEYS if section not in finished
+        }
+        if None not in finished:
+            futures[executor.submit(
+                _complete_json_with_retries, build_summary_prompt(mte_data),
+                selected_model, SECTIONED_EVALUATION["summary_tokens"], timeout, "overall_score"
+            )] = None
+
+        for future in as_completed(futures):
+            section = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append(f"{section or 'summary'}: {e}")
+                continue
+            finished[section] = result
+            if cache:
+                cache.set(part_keys[section], result)
+            if section is not None:
+                yield ("section", section, result)
+
+    if errors:
+        yield ("done", {"error": "Sectioned evaluation failed. " + " | ".join(errors)})
+        return
+
+    summary = finished[None]
+    feedback_dict = {
+        "section_scores": {section: finished[section] for section in SECTION_KEYS},
+        "overall_score": summary["overall_score"],
+        "strengths": summary.get("strengths", []),
+        "areas_for_improvement": summary.get("areas_for_improvement", []),
+        "suggestions": summary.get("suggestions", [])
+    }
+    if cache:
+        cache.set(cache_key, feedback_dict)
+        # The parts are only needed until the whole evaluation is cached
+        cache.delete(*part_keys.values())
+    yield ("done", feedback_dict)
+
+def evaluate_mte_sectioned(mte_data, selected_model, refresh=False, timeout=None):
+    feedback_dict = {"error": "No response from model."}
+    for event in stream_evaluate_mte_sectioned(mte_data, selected_model, refresh=refresh, timeout=timeout):
+        if event[0] == "done":
+            feedback_dict = event[1]
+    return feedback_dict
+
+async def evaluate_mte_async(mte_data, selected_model, refresh=False, timeout=None):
+    """
+    Async counterpart of evaluate_mte. Waits on the shared rate limiter
+    instead of blocking a thread, so many evaluations can be in flight.
+    """
+    cache = get_result_cache()
+    cache_key = evaluation_cache_key(mte_data, selected_model)
+    if cache and not refresh:
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        messages = build_prompt(mte_data)
+        reserved = estimate_tokens(messages)
+        async_client = get_async_client()
+        if timeout:
+            async_client = async_client.with_options(timeout = timeout)
+
+        response = await _send_with_retries_async(
+            lambda: async_client.chat.completions.create(**_request_kwargs(messages, selected_model)),
+            selected_model, reserved, rate_limits_only=bool(timeout)
+        )
+        feedback_dict = _feedback_from_response(response, selected_model, reserved)
+        if cache and "error" not in feedback_dict:
+            await asyncio.to_thread(cache.set, cache_key, feedback_dict)
+        return feedback_dict
 
     except Exception as e:
         return {"error": str(e)}
 
+async def evaluate_many_async(submissions, selected_model, refresh=False):
+    """
+    Evaluates a list of mte_data dicts concurrently; the rate limiter decides
+    how many requests actually go out at once. Results keep the input order.
+    """
+    return await asyncio.gather(*(
+        evaluate_mte_async(mte_data, selected_model, refresh=refresh)
+        for mte_data in submissions
+    ))
+
+def evaluate_many(submissions, selected_model, refresh=False):
+    return asyncio.run(evaluate_many_async(submissions, selected_model, refresh=refresh))
+
+SECTION_TITLES = {
+    "academic_progress": "Academic Progress and Vacation Plan",
+    "co-curricular": "Co and Extra Curricular Progress-Plan",
+    "financial_needs": "Financial Requirements for the next 3 months",
+    "difficulties": "Difficulties (Social, Family, etc.)",
+    "exam_results": "Results of the exams",
+    "books_and_videos": "Reading Books / Watching Videos",
+    "health": "Exercise, Diet & Sleep",
+    "learning_from_people": "Learning From Friends & Acquaintances",
+    "essay": "Essay on a topic of your choice",
+    "action_plan": "Action Plan for the coming month",
+}
+
+MENTOR_ROLE = "You are an empathetic, detail-oriented mentor reviewing a student's Monthly Thinking Exercise (MTE)."
+
+SCORING_RUBRIC = """
+    ### Scoring Rubric:
+    - Coherence: Evaluate logical flow, structure, and clarity.
+    - Creativity: Originality, critical thinking, and problem-solving.
+    - Completeness: Thoroughness in answering the MTE questions.
+    - Depth: Thoughtfulness, self-reflection, and insightful elaboration.
+"""
+
+SECTION_SCHEMA = '{"score": <1-10>, "reason": "...", "feedback": "...", "suggestions": "..."}'
+
+SUMMARY_SCHEMA = '"overall_score": <1-10>, "strengths": ["...", "..."], "areas_for_improvement": ["...", "..."], "suggestions": ["...", "..."]'
+
+def _instructions(text):
+    """
+    Strips the source indentation from a system prompt; it would otherwise
+    be sent, and billed, on every line.
+    """
+    return "\n".join(line.strip() for line in text.strip().splitlines())
+
+def _submission_text(mte_data):
+    """
+    Numbered sections of the submission, compacted and cut down to PROMPT_BUDGET.
+    """
+    sections, _ = fit_sections(mte_data, SECTION_KEYS)
+    lines = ["Student Submission:"]
+    for index, section in enumerate(SECTION_KEYS, start=1):
+        lines.append(f"{index}. **{SECTION_TITLES[section]}:** {sections[section]}")
+    return "\n".join(lines)
+
 def build_prompt(mte_data):
     """
-    Constructs the prompt for the model.
+    Constructs the prompt for the model. The output schema is given once
+    for all sections, and the submission is kept within PROMPT_BUDGET.
     """
-    system_content = """
-    You are an empathetic, detail-oriented mentor reviewing a student's Monthly Thinking Exercise (MTE). 
+    system_content = f"""
+    {MENTOR_ROLE}
     You must evaluate each section using a well-rounded perspective. Carefully assess and display a detailed response.
 
     ### Instructions:
     1. For each section, provide a thorough and detailed analysis and score from 1 to 10 based on the scoring rubric.
-       ### Scoring Rubric:
-       - Coherence: Evaluate logical flow, structure, and clarity.
-       - Creativity: Originality, critical thinking, and problem-solving.
-       - Completeness: Thoroughness in answering the MTE questions.
-       - Depth: Thoughtfulness, self-reflection, and insightful elaboration.
+    {SCORING_RUBRIC}
     2. Reason step-by-step for each score.
     3. Provide a final rating (1-10) for the MTE overall.
     4. Identify the student's strengths and areas of improvement.
@@ -63,102 +525,66 @@ def build_prompt(mte_data):
     6. Recommend learning resources (videos/books) personalized to their gaps.
 
     ### Output Format (JSON):
-    {
-        "section_scores": {
-            "academic_progress": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "co-curricular": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "financial_needs": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "difficulties": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "exam_results": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "books_and_videos": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "health": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "learning_from_people": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "essay": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            },
-            "action_plan": {
-                "score": ...,
-                "reason": "...",
-                "feedback": "...",
-                "suggestions": "..."
-            }
-        },
-        "overall_score": ...,
-        "strengths": ["...", "..."],
-        "areas_for_improvement": ["...", "..."],
-        "suggestions": ["...", "..."]
-     }
+    {{"section_scores": {{"<section>": {SECTION_SCHEMA}, ...}}, {SUMMARY_SCHEMA}}}
+    section_scores has one entry per section, in this order: {", ".join(SECTION_KEYS)}.
 
     ONLY output valid JSON. No additional text.
     """
 
-    user_content = f"""
-    Student Submission:
-    1. **Academic Progress and Vacation Plan:** {mte_data.get("academic_progress")}
-    2. **Co and Extra Curricular Progress-Plan:** {mte_data.get("co-curricular")}
-    3. **Financial Requirements for the next 3 months:** {mte_data.get("financial_needs")}
-    4. **Difficulties (Social, Family, etc.):** {mte_data.get("difficulties")}
-    5. **Results of the exams:** {mte_data.get("exam_results")}
-    6. **Reading Books / Watching Videos:** {mte_data.get("books_and_videos")}
-    7. **Exercise, Diet & Sleep:** {mte_data.get("health")}
-    8. **Learning From Friends & Acquaintances:** {mte_data.get("learning_from_people")}
-    9. **Essay on a topic of your choice:** {mte_data.get("essay")}
-    10. **Action Plan for the coming month:** {mte_data.get("action_plan")}
+    return [
+        {"role": "system", "content": _instructions(system_content)},
+        {"role": "user", "content": _submission_text(mte_data)}
+    ]
+
+def build_section_prompt(section, content):
+    """
+    Constructs the prompt for evaluating a single section (sectioned mode).
+    """
+    system_content = f"""
+    {MENTOR_ROLE}
+    Evaluate only the section "{SECTION_TITLES[section]}" and score it from 1 to 10.
+    {SCORING_RUBRIC}
+    Reason step-by-step for the score and give empathetic but actionable advice.
+
+    ### Output Format (JSON):
+    {SECTION_SCHEMA}
+
+    ONLY output valid JSON. No additional text.
+    """
+
+    content = truncate_to_tokens(content, PROMPT_BUDGET["section_tokens"])
+    return [
+        {"role": "system", "content": _instructions(system_content)},
+        {"role": "user", "content": f"**{SECTION_TITLES[section]}:** {content}"}
+    ]
+
+def build_summary_prompt(mte_data):
+    """
+    Constructs the prompt for the overall rating of a submission (sectioned mode).
+    """
+    system_content = f"""
+    {MENTOR_ROLE}
+    {SCORING_RUBRIC}
+    Provide a final rating (1-10) for the MTE overall, identify the student's strengths
+    and areas of improvement, and recommend learning resources (videos/books)
+    personalized to their gaps.
+
+    ### Output Format (JSON):
+    {{{SUMMARY_SCHEMA}}}
+
+    ONLY output valid JSON. No additional text.
     """
 
     return [
-        {"role": "system", "content": system_content.strip()},
-        {"role": "user", "content": user_content.strip()}
+        {"role": "system", "content": _instructions(system_content)},
+        {"role": "user", "content": _submission_text(mte_data)}
     ]
 
 def extract_json(text):
     """
     Extracts a JSON block from the model's response, even if surrounded by extra formatting.
     """
-    text = text.strip()
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
     text = text.replace("```json", "").replace("```", "").strip()
 
     match = re.search(r"\{.*\}", text, re.DOTALL)
@@ -0,0 +1,68 @@
+# folder_cache.py
+import json
+import os
+import threading
+
+
+class FolderCache:
+    """
+    Persistent map from (parent folder ID, folder name) to Drive folder ID,
+    stored as a JSON file so lookups survive between runs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._folders = self._load()
+
+    @staticmethod
+    def _key(name, parent_id=None):
+        return f"{parent_id or ''}/{name}"
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Error loading folder cache: {e}")
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self._folders, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def lock_for(self, name, parent_id=None):
+        """
+        Returns a lock dedicated to one folder name, so concurrent workers
+        resolve (and possibly create) each folder exactly once.
+        """
+        with self._lock:
+            return self._key_locks.setdefault(self._key(name, parent_id), threading.Lock())
+
+    def get(self, name, parent_id=None):
+        with self._lock:
+            return self._folders.get(self._key(name, parent_id))
+
+    def set(self, name, folder_id, parent_id=None):
+        with self._lock:
+            self._folders[self._key(name, parent_id)] = folder_id
+            self._save()
+
+    def update(self, folders, parent_id=None):
+        """
+        Stores many {name: folder_id} entries under one parent in a single write.
+        """
+        with self._lock:
+            for name, folder_id in folders.items():
+                self._folders[self._key(name, parent_id)] = folder_id
+            self._save()
+
+    def invalidate(self, name, parent_id=None):
+        with self._lock:
+            if self._folders.pop(self._key(name, parent_id), None) is not None:
+                self._save()
@@ -2,20 +2,25 @@
 
 import os
 import base64
+import hashlib
 import io
-from email import message_from_bytes
+import threading
+import time
 from email.message import EmailMessage
-from fpdf import FPDF
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from evaluator import evaluate_mte
-from utils import extract_mte_data
-from config import CONFIG, ENV
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
+from model_router import get_router
+from utils import extract_mte_data, save_feedback_to_json
+from config import (
+    CONFIG, ENV, DEFAULT_MODEL, FOLDER_CACHE_PATH, UPLOAD_RESUMABLE_THRESHOLD, ATTACHMENT_STORE, LEDGER_PATH
+)
+from attachment_store import AttachmentStore
+from folder_cache import FolderCache
+from google_services import build_service, get_credentials
+from ledger import Ledger
+from metrics import get_metrics
+from pipeline import StagedPipeline
 from datetime import datetime
-from fpdf.enums import XPos, YPos
 
 # Get environment-specific configuration
 central_authority_email = CONFIG[ENV]["central_authority_email"]
@@ -26,168 +31,240 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive.file'
 ]
 
+# Credentials are shared; API clients are per thread because the underlying
+# httplib2 connections are not thread-safe (see google_services.py).
+_credentials = None
+_thread_state = threading.local()
+
 def authenticate_services():
-    creds = None
-    if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
-    gmail_service = build('gmail', 'v1', credentials=creds)
-    drive_service = build('drive', 'v3', credentials=creds)
-    return gmail_service, drive_service
-
-def get_unread_messages(service):
+    global _credentials
+    _credentials = get_credentials(SCOPES)
+    return thread_services()
+
+def thread_services():
+    """
+    Returns the (gmail_service, drive_service) pair owned by the calling thread.
+    """
+    if getattr(_thread_state, 'credentials', None) is not _credentials:
+        gmail_service = build_service('gmail', 'v1', _credentials)
+        drive_service = build_service('drive', 'v3', _credentials)
+        _thread_state.services = (gmail_service, drive_service)
+        _thread_state.credentials = _credentials
+    return _thread_state.services
+
+def with_gmail(fn, *args, **kwargs):
+    return fn(thread_services()[0], *args, **kwargs)
+
+def with_drive(fn, *args, **kwargs):
+    return fn(thread_services()[1], *args, **kwargs)
+
+# Gmail allows up to 100 calls per batch request but throttles large batches;
+# 50 keeps each batch well inside the per-user concurrency limit.
+BATCH_SIZE = 50
+MESSAGE_FIELDS = 'id,threadId,payload(headers,parts,filename,mimeType,body(attachmentId,size))'
+
+def get_unread_messages(service, query="is:unread"):
+    """
+    Lists every message matching the query, following nextPageToken.
+    """
+    messages = []
+    page_token = None
     try:
-        response = service.users().messages().list(userId=user_id, labelIds=['INBOX'], q="is:unread").execute()
-        return response.get('messages', [])
+        while True:
+            response = service.users().messages().list(
+                userId=user_id, labelIds=['INBOX'], q=query,
+                maxResults=500, pageToken=page_token
+            ).execute()
+            messages.extend(response.get('messages', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
     except Exception as error:
         print(f'Error fetching messages: {error}')
-        return []
+    return messages
+
+def _execute_batched(service, requests):
+    """
+    Executes (request_id, request) pairs through the Gmail batch endpoint
+    and returns {request_id: response}. Failed calls are logged and omitted.
+    """
+    responses = {}
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            print(f'Error in batch request {request_id}: {exception}')
+        else:
+            responses[request_id] = response
+
+    for start in range(0, len(requests), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=callback)
+        for request_id, request in requests[start:start + BATCH_SIZE]:
+            batch.add(request, request_id=request_id)
+        try:
+            batch.execute()
+        except Exception as error:
+            print(f'Error executing batch request: {error}')
+    return responses
+
+def get_messages(service, msg_ids):
+    """
+    Fetches headers and MIME structure for many messages in batched calls.
+    Attachment bodies are not included; see get_xlsx_attachments.
+    """
+    requests = [
+        (msg_id, service.users().messages().get(userId=user_id, id=msg_id, format='full', fields=MESSAGE_FIELDS))
+        for msg_id in msg_ids
+    ]
+    with get_metrics().stage("get_messages", count=len(requests)) as span:
+        messages = _execute_batched(service, requests)
+        span["fetched"] = len(messages)
+    return messages
+
+def get_headers(message, name):
+    """
+    Returns all values of a header in a Gmail message resource.
+    """
+    headers = message.get('payload', {}).get('headers', [])
+    return [header['value'] for header in headers if header['name'].lower() == name.lower()]
+
+def find_xlsx_part(payload):
+    """
+    Returns the first .xlsx attachment part of a message payload, or None.
+    """
+    filename = payload.get('filename', '')
+    if filename and filename.endswith('.xlsx'):
+        return payload
+    for part in payload.get('parts', []):
+        found = find_xlsx_part(part)
+        if found:
+            return found
+    return None
 
-def get_message(service, msg_id):
+def get_xlsx_attachments(service, messages):
+    """
+    Downloads only the .xlsx attachment of each message, in batched
+    attachments().get calls. Returns {msg_id: (filename, data)}.
+    """
+    parts = {}
+    requests = []
+    for msg_id, message in messages.items():
+        part = find_xlsx_part(message.get('payload', {}))
+        if not part:
+            continue
+        parts[msg_id] = part
+        attachment_id = part.get('body', {}).get('attachmentId')
+        if attachment_id:
+            requests.append((msg_id, service.users().messages().attachments().get(
+                userId=user_id, messageId=msg_id, id=attachment_id
+            )))
+
+    with get_metrics().stage("get_attachments", count=len(requests)) as span:
+        bodies = _execute_batched(service, requests)
+        attachments = {}
+        for msg_id, part in parts.items():
+            body = bodies.get(msg_id, part.get('body', {}))
+            if body.get('data'):
+                attachments[msg_id] = (part['filename'], base64.urlsafe_b64decode(body['data']))
+        span["fetched"] = len(attachments)
+        span["bytes"] = sum(len(data) for _, data in attachments.values())
+    return attachments
+
+# Label applied to every processed message; doubles as an idempotency marker
+PROCESSED_LABEL = 'MTE-Processed'
+UNPROCESSED_QUERY = f'is:unread -label:{PROCESSED_LABEL}'
+MODIFY_CHUNK = 1000  # batchModify accepts at most 1000 IDs per call
+
+def get_or_create_label(service, name=PROCESSED_LABEL):
+    """
+    Returns the ID of the Gmail label with the given name, creating it if needed.
+    """
+    labels = service.users().labels().list(userId=user_id).execute().get('labels', [])
+    for label in labels:
+        if label['name'] == name:
+            return label['id']
+    label = service.users().labels().create(
+        userId=user_id,
+        body={'name': name, 'labelListVisibility': 'labelShow', 'messageListVisibility': 'show'}
+    ).execute()
+    return label['id']
+
+def mark_as_read(service, msg_ids, label_id=None):
+    """
+    Marks messages as read and applies the processed label, committing
+    up to MODIFY_CHUNK messages per batchModify call. Returns the IDs
+    that were marked.
+    """
+    marked = []
+    body = {'removeLabelIds': ['UNREAD']}
+    if label_id:
+        body['addLabelIds'] = [label_id]
+    for start in range(0, len(msg_ids), MODIFY_CHUNK):
+        chunk = msg_ids[start:start + MODIFY_CHUNK]
+        try:
+            with get_metrics().stage("mark_as_read", count=len(chunk)):
+                service.users().messages().batchModify(
+                    userId=user_id,
+                    body={**body, 'ids': chunk}
+                ).execute()
+            marked.extend(chunk)
+        except Exception as error:
+            print(f'Error marking messages as read: {error}')
+    return marked
+
+attachment_store = AttachmentStore(ATTACHMENT_STORE["path"]) if ATTACHMENT_STORE["enabled"] else None
+
+def archive(data, extension):
+    """
+    Keeps a content-addressed copy of data when ATTACHMENT_STORE is enabled.
+    Returns the SHA-256 digest, or None if nothing was stored.
+    """
+    if attachment_store is None:
+        return None
     try:
-        message = service.users().messages().get(userId=user_id, id=msg_id, format='raw').execute()
-        msg_str = base64.urlsafe_b64decode(message['raw'].encode('ASCII'))
-        return message_from_bytes(msg_str)
+        with get_metrics().stage("archive", bytes=len(data)):
+            return attachment_store.put(data, extension)
     except Exception as error:
-        print(f'Error fetching message: {error}')
+        print(f'Error archiving attachment: {error}')
         return None
 
-def mark_as_read(service, msg_id):
+_ledger = None
+
+def get_ledger():
+    """
+    Returns the processing ledger, opening (and creating) it on first use.
+    """
+    global _ledger
+    if _ledger is None:
+        _ledger = Ledger(LEDGER_PATH)
+    return _ledger
+
+def attachment_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+
+def generate_pdf(feedback, pdf_path=None):
+    """
+    Renders the feedback report and returns the PDF bytes.
+    The PDF is also written to pdf_path when one is given.
+    """
+    from pdf_renderer import get_renderer
     try:
-        service.users().messages().modify(
-            userId=user_id,
-            id=msg_id,
-            body={'removeLabelIds': ['UNREAD']}
-        ).execute()
-    except Exception as error:
-        print(f'Error marking message as read: {error}')
+        renderer = get_renderer()
+    except FileNotFoundError as error:
+        print(error)
+        return None
+    pdf_bytes = renderer.render(feedback)
+    if pdf_path:
+        os.makedirs(os.path.dirname(pdf_path) or '.', exist_ok=True)
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_bytes)
+    return pdf_bytes
 
-def save_attachment(mime_msg, download_folder):
-    for part in mime_msg.walk():
-        if part.get_content_maintype() == 'multipart':
-            continue
-        if part.get('Content-Disposition') is None:
-            continue
-        filename = part.get_filename()
-        if filename and filename.endswith('.xlsx'):
-            os.makedirs(download_folder, exist_ok=True)
-            filepath = os.path.join(download_folder, filename)
-            with open(filepath, 'wb') as f:
-                f.write(part.get_payload(decode=True))
-            return filepath
-    return None
 
 
 
-def generate_pdf(feedback, pdf_path):
-    # Extract relevant data
-    section_scores = feedback.get("section_scores", {})
-    strengths = feedback.get("strengths", [])
-    areas_for_improvement = feedback.get("areas_for_improvement", [])
-    suggestions = feedback.get("suggestions", [])
-
-    # Metadata
-    student_name = feedback.get("student_name", "N/A")
-    submission_month = feedback.get("submission_month", "N/A")
-    college_name = feedback.get("college_name", "N/A")
-    student_class = feedback.get("class_info", "N/A")
-    generation_date = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-
-    # Initialize PDF
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-
-    font_path = 'fonts/DejaVuSans.ttf'
-    font_path_bold = 'fonts/DejaVuSans-Bold.ttf'
-    if not os.path.exists(font_path):
-        print(f"Font file not found at {font_path}.")
-        return
-    pdf.add_font('DejaVu', '', font_path)
-    pdf.add_font('DejaVu', 'B', font_path_bold)
-    pdf.set_font('DejaVu', '', 16)
-
-    # Title
-    pdf.cell(0, 10, "MTE Evaluation Report", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
-    pdf.ln(10)
-    pdf.set_font("DejaVu", '', 12)
-
-    # Student details
-    student_details = [
-        f"Name of the Student: {student_name}",
-        f"Submission Month: {submission_month}",
-        f"College Name: {college_name}",
-        f"Class: {student_class}",
-        f"PDF Generated On: {generation_date}"
-    ]
-    for line in student_details:
-        pdf.multi_cell(0, 8, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-    pdf.ln(5)
-
-    # Utility function for bullets
-    def add_bullet_section(title, items):
-        if not items:
-            return
-        pdf.set_font("DejaVu", 'B', 12)
-        pdf.cell(0, 10, f"{title}:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        pdf.set_font("DejaVu", '', 12)
-        for item in items:
-            if max((len(w) for w in item.split()), default=0) > 80:
-                pdf.set_font("DejaVu", '', 10)
-                pdf.multi_cell(0, 8, f"• {item}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-                pdf.set_font("DejaVu", '', 12)
-            else:
-                pdf.multi_cell(0, 8, f"• {item}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        pdf.ln(3)
-
-    # Add bullet sections
-    add_bullet_section("Strengths", strengths)
-    add_bullet_section("Areas for Improvement", areas_for_improvement)
-    add_bullet_section("Suggestions", suggestions)
-
-    # Section-wise Scores
-    if section_scores:
-        pdf.set_font("DejaVu", 'B', 12)
-        pdf.cell(0, 10, "Section-wise Evaluation:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        pdf.set_font("DejaVu", '', 12)
-        pdf.ln(3)
-        for section, details in section_scores.items():
-            section_title = section.replace("_", " ").title()
-            pdf.set_font("DejaVu", 'B', 12)
-            pdf.cell(0, 10, f"{section_title} (Score: {details['score']})", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-            pdf.set_font("DejaVu", '', 12)
-            lines = [
-                f"• Reason: {details['reason']}",
-                f"• Feedback: {details['feedback']}",
-                f"• Suggestions: {details['suggestions']}"
-            ]
-            for line in lines:
-                if not line.strip():
-                    continue
-                if max((len(word) for word in line.split()), default=0) > 80:
-                    pdf.set_font("DejaVu", '', 10)
-                    pdf.multi_cell(0, 8, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-                    pdf.set_font("DejaVu", '', 12)
-                else:
-                    pdf.multi_cell(0, 8, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-            pdf.ln(3)
-
-    # Save PDF
-    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
-    pdf.output(pdf_path)
-
-
-
-
-def send_email_with_attachment(service, to, cc, subject, body_text, file_path):
+def send_email_with_attachment(service, to, cc, subject, body_text, file_data, file_name):
     message = EmailMessage()
     message['To'] = to
     if cc:
@@ -195,15 +272,12 @@ def send_email_with_attachment(service, to, cc, subject, body_text, file_path):
     message['From'] = user_id
     message['Subject'] = subject
     message.set_content(body_text)
-
-    with open(file_path, 'rb') as f:
-        file_data = f.read()
-        file_name = os.path.basename(file_path)
     message.add_attachment(file_data, maintype='application', subtype='pdf', filename=file_name)
 
     encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
     create_message = {'raw': encoded_message}
-    send_message = service.users().messages().send(userId=user_id, body=create_message).execute()
+    with get_metrics().stage("send_email", bytes=len(encoded_message)):
+        send_message = service.users().messages().send(userId=user_id, body=create_message).execute()
     print(f'Message sent. ID: {send_message["id"]}')
 
 def create_folder(service, name, parent_id=None):
@@ -224,85 +298,208 @@ def search_folder(service, name, parent_id=None):
     files = results.get('files', [])
     return files[0]['id'] if files else None
 
-def upload_file(service, file_path, folder_id):
+def list_child_folders(service, parent_id):
+    """
+    Returns {name: folder_id} for every folder directly under parent_id,
+    following nextPageToken. The first folder wins if names repeat.
+    """
+    query = f"'{parent_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
+    folders = {}
+    page_token = None
+    while True:
+        results = service.files().list(
+            q=query, spaces='drive', pageSize=1000,
+            fields='nextPageToken, files(id, name)', pageToken=page_token
+        ).execute()
+        for file in results.get('files', []):
+            folders.setdefault(file['name'], file['id'])
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return folders
+
+folder_cache = FolderCache(FOLDER_CACHE_PATH)
+
+def warm_folder_cache(service, parent_id):
+    """
+    Loads every student folder under parent_id into the cache with one listing.
+    """
+    folders = list_child_folders(service, parent_id)
+    folder_cache.update(folders, parent_id=parent_id)
+    print(f'Cached {len(folders)} student folders.')
+
+def get_or_create_folder(service, name, parent_id=None):
+    """
+    Returns the ID of the named folder, creating it if needed.
+    Cached IDs are used without a Drive query, and each name is resolved
+    under its own lock so two workers never create the same folder twice.
+    """
+    folder_id = folder_cache.get(name, parent_id)
+    if folder_id:
+        return folder_id
+    with folder_cache.lock_for(name, parent_id):
+        folder_id = folder_cache.get(name, parent_id)
+        if not folder_id:
+            folder_id = search_folder(service, name, parent_id=parent_id)
+            if not folder_id:
+                folder_id = create_folder(service, name, parent_id=parent_id)
+            folder_cache.set(name, folder_id, parent_id=parent_id)
+        return folder_id
+
+def is_not_found(error):
+    return isinstance(error, HttpError) and error.resp.status == 404
+
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def upload_file(service, data, name, folder_id, mimetype='application/octet-stream'):
+    """
+    Uploads in-memory bytes to a Drive folder. Files below
+    UPLOAD_RESUMABLE_THRESHOLD go up in a single multipart request;
+    larger ones use a resumable session.
+    """
     file_metadata = {
-        'name': os.path.basename(file_path),
+        'name': name,
         'parents': [folder_id]
     }
-    media = MediaFileUpload(file_path, resumable=True)
-    file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+    resumable = len(data) >= UPLOAD_RESUMABLE_THRESHOLD
+    media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mimetype, resumable=resumable)
+    # Traced per upload to tune UPLOAD_RESUMABLE_THRESHOLD
+    with get_metrics().stage("upload", file=name, bytes=len(data), resumable=resumable):
+        file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
     return file.get('id')
 
-
-
-
-def main():
-    gmail_service, drive_service = authenticate_services()
-    messages = get_unread_messages(gmail_service)
-    print(f'Found {len(messages)} unread messages.')
-
-    mte_folder_id = search_folder(drive_service, 'MTE_Submissions')
-    if not mte_folder_id:
-        mte_folder_id = create_folder(drive_service, 'MTE_Submissions')
-
-    for msg in messages:
-        mime_msg = get_message(gmail_service, msg['id'])
-        if not mime_msg:
-            continue
-
-        sender = mime_msg['From']
-        subject = mime_msg['Subject']
-        raw_cc = mime_msg.get_all('Cc', [])
-        cc_emails = []
-
-        if raw_cc:
-            for item in raw_cc:
-                cc_emails.extend([addr.strip() for addr in item.split(',')])
-
-        student_email = sender.split('<')[-1].strip('>') if '<' in sender else sender.strip()
-        mentor_emails = [email for email in cc_emails if email.lower() != central_authority_email.lower()]
-        print(f'Processing email from {student_email} | Subject: {subject} | Mentors: {mentor_emails}')
-
-        attachment_path = save_attachment(mime_msg, 'downloads')
-        if attachment_path:
-            print(f'Attachment saved: {attachment_path}')
-            mte_data = extract_mte_data(attachment_path)
-
-            # Extract student metadata
-            student_name = mte_data.get("student_name", "N/A")
-            submission_month = mte_data.get("submission_month", "N/A")
-            college_name = mte_data.get("college_name", "N/A")
-            student_class = mte_data.get("class_info", "N/A")
-
-            # Evaluate and enrich feedback
-            feedback = evaluate_mte(mte_data, selected_model='deepseek-r1-distill-llama-70b')
-
-            feedback.update({
-                "student_name": student_name,
-                "submission_month": submission_month,
-                "college_name": college_name,
-                "class_info": student_class
-            })
-
-            # Create student folder if not exists
-            student_folder_id = search_folder(drive_service, student_email, parent_id=mte_folder_id)
-            if not student_folder_id:
-                student_folder_id = create_folder(drive_service, student_email, parent_id=mte_folder_id)
-
-            # Generate PDF path
-            pdf_filename = os.path.splitext(os.path.basename(attachment_path))[0] + '_feedback.pdf'
-            pdf_path = os.path.join('reports', pdf_filename)
-
-            # Generate PDF
-            generate_pdf(feedback, pdf_path)
-            print(f'Generated PDF: {pdf_path}')
-
-            # Upload both original and feedback
-            upload_file(drive_service, attachment_path, student_folder_id)
-            upload_file(drive_service, pdf_path, student_folder_id)
-
-            # Prepare metadata for email body using variables, not feedback.get()
-            metadata_text = f"""
+def upload_to_folder(service, data, filename, mimetype, name, parent_id):
+    """
+    Uploads into the named folder, re-resolving the folder once if its
+    cached ID no longer exists on Drive.
+    """
+    folder_id = get_or_create_folder(service, name, parent_id=parent_id)
+    try:
+        return upload_file(service, data, filename, folder_id, mimetype)
+    except HttpError as error:
+        if not is_not_found(error):
+            raise
+        folder_cache.invalidate(name, parent_id)
+        folder_id = get_or_create_folder(service, name, parent_id=parent_id)
+        return upload_file(service, data, filename, folder_id, mimetype)
+
+
+
+
+def process_message(pipeline, message, attachment, mte_folder_id):
+    """
+    Runs one fetched message and its .xlsx attachment through every stage
+    of the pipeline. Returns the message ID once the reports have been sent;
+    the caller marks it as read.
+
+    Every finished stage is recorded in the ledger under the message ID and
+    attachment hash. A message seen again after a crash resumes at its first
+    unfinished stage: a stored evaluation is reused rather than requested
+    again, and a report already sent to a recipient is not sent twice.
+    """
+    msg_id = message['id']
+    sender = (get_headers(message, 'From') or [''])[0]
+    subject = (get_headers(message, 'Subject') or [''])[0]
+    raw_cc = get_headers(message, 'Cc')
+    cc_emails = []
+
+    if raw_cc:
+        for item in raw_cc:
+            cc_emails.extend([addr.strip() for addr in item.split(',')])
+
+    student_email = sender.split('<')[-1].strip('>') if '<' in sender else sender.strip()
+    mentor_emails = [email for email in cc_emails if email.lower() != central_authority_email.lower()]
+    print(f'Processing email from {student_email} | Subject: {subject} | Mentors: {mentor_emails}')
+
+    # The attachment stays in memory from decode through parsing and upload
+    filename, data = attachment
+    filename = os.path.basename(filename)
+    digest = attachment_digest(data)
+    ledger = get_ledger()
+    done = ledger.completed(msg_id, digest)
+    if done:
+        print(f'Resuming {msg_id} after stages: {", ".join(done)}')
+    else:
+        archived = archive(data, '.xlsx')
+        print(f'Attachment received: {filename} ({len(data)} bytes)' + (f', archived as {archived}' if archived else ''))
+        ledger.record(msg_id, digest, "fetched", {"filename": filename, "from": student_email, "subject": subject})
+
+    metrics = get_metrics()
+    if "parsed" in done:
+        mte_data = done["parsed"].payload
+    else:
+        # Parsing runs on a worker process, so the span includes queueing and IPC
+        with metrics.stage("parse", msg_id=msg_id, bytes=len(data)) as span:
+            mte_data = pipeline.call("parse", extract_mte_data, io.BytesIO(data))
+            if "error" in mte_data:
+                span.update(outcome="error", error=mte_data["error"])
+        if "error" in mte_data:
+            # Every unparsable workbook has the same (empty) sections, so
+            # evaluating it would send one cached report to every such student.
+            # Leave the message unread and count it as failed instead.
+            raise RuntimeError(mte_data["error"])
+        ledger.record(msg_id, digest, "parsed", mte_data)
+
+    # Extract student metadata
+    student_name = mte_data.get("student_name", "N/A")
+    submission_month = mte_data.get("submission_month", "N/A")
+    college_name = mte_data.get("college_name", "N/A")
+    student_class = mte_data.get("class_info", "N/A")
+
+    # Evaluate while the student folder is looked up on Drive
+    if "evaluated" in done:
+        feedback = done["evaluated"].payload
+    else:
+        evaluate_started = time.perf_counter()
+        feedback_future = pipeline.submit("evaluate", get_router().evaluate_with_model, mte_data, preferred=DEFAULT_MODEL)
+        folder_future = None
+        if "uploaded" not in done:
+            folder_future = pipeline.submit("drive", with_drive, get_or_create_folder, student_email, parent_id=mte_folder_id)
+
+        feedback, model = feedback_future.result()
+        # Labelled with the model that answered, after any fallback or hedge
+        metrics.record(
+            "evaluate", time.perf_counter() - evaluate_started, "error" if "error" in feedback else "ok",
+            msg_id=msg_id, model=model, **({"error": feedback["error"]} if "error" in feedback else {})
+        )
+        if "error" in feedback:
+            # Leave the message unread so the next run retries it
+            raise RuntimeError(f"Evaluation failed: {feedback['error']}")
+        feedback.update({
+            "student_name": student_name,
+            "submission_month": submission_month,
+            "college_name": college_name,
+            "class_info": student_class
+        })
+        ledger.record(msg_id, digest, "evaluated", feedback)
+        save_feedback_to_json(feedback, student_email)
+        if folder_future:
+            folder_future.result()
+
+    # Generate PDF
+    pdf_filename = os.path.splitext(filename)[0] + '_feedback.pdf'
+    if "rendered" in done and done["rendered"].data:
+        pdf_bytes = done["rendered"].data
+    else:
+        with metrics.stage("render", msg_id=msg_id) as span:
+            pdf_bytes = pipeline.call("render", generate_pdf, feedback)
+            if not pdf_bytes:
+                raise RuntimeError("PDF generation failed")
+            span["bytes"] = len(pdf_bytes)
+        archive(pdf_bytes, '.pdf')
+        ledger.record(msg_id, digest, "rendered", {"filename": pdf_filename}, pdf_bytes)
+        print(f'Generated PDF: {pdf_filename} ({len(pdf_bytes)} bytes)')
+
+    # Upload both original and feedback concurrently, straight from memory
+    if "uploaded" not in done:
+        uploads = [
+            pipeline.submit("drive", with_drive, upload_to_folder, data, filename, XLSX_MIME, student_email, mte_folder_id),
+            pipeline.submit("drive", with_drive, upload_to_folder, pdf_bytes, pdf_filename, 'application/pdf', student_email, mte_folder_id)
+        ]
+        file_ids = [upload.result() for upload in uploads]
+        ledger.record(msg_id, digest, "uploaded", {"file_ids": file_ids})
+
+    # Prepare metadata for email body using variables, not feedback.get()
+    metadata_text = f"""
 Name of the Student: {student_name}
 Submission Month: {submission_month}
 College Name: {college_name}
@@ -310,8 +507,8 @@ Class: {student_class}
 Report generated on: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}
 """
 
-            # Send to Student
-            student_body_text = f"""Dear {student_name},
+    # Send to Student
+    student_body_text = f"""Dear {student_name},
 
 Please find your MTE Feedback Report attached.
 
@@ -321,18 +518,21 @@ Here are your details:
 Regards,
 Guruji Foundation
 """
-            send_email_with_attachment(
-                service=gmail_service,
-                to=student_email,
-                cc="",
-                subject='MTE Feedback Report',
-                body_text=student_body_text,
-                file_path=pdf_path
-            )
-
-            # Send to Mentor
-            if mentor_emails:
-                mentor_body_text = f"""Dear Mentor,
+    if "sent_student" not in done:
+        pipeline.call(
+            "gmail", with_gmail, send_email_with_attachment,
+            to=student_email,
+            cc="",
+            subject='MTE Feedback Report',
+            body_text=student_body_text,
+            file_data=pdf_bytes,
+            file_name=pdf_filename
+        )
+        ledger.record(msg_id, digest, "sent_student", {"to": student_email})
+
+    # Send to Mentor
+    if mentor_emails and "sent_mentors" not in done:
+        mentor_body_text = f"""Dear Mentor,
 
 Please find your student's MTE Feedback Report attached.
 
@@ -342,19 +542,82 @@ Student Details:
 Regards,
 Guruji Foundation
 """
-                send_email_with_attachment(
-                    service=gmail_service,
-                    to=", ".join(mentor_emails),
-                    cc="",
-                    subject='MTE Feedback Report of Your Student',
-                    body_text=mentor_body_text,
-                    file_path=pdf_path
-                )
+        pipeline.call(
+            "gmail", with_gmail, send_email_with_attachment,
+            to=", ".join(mentor_emails),
+            cc="",
+            subject='MTE Feedback Report of Your Student',
+            body_text=mentor_body_text,
+            file_data=pdf_bytes,
+            file_name=pdf_filename
+        )
+        ledger.record(msg_id, digest, "sent_mentors", {"to": mentor_emails})
+
+    return msg_id
+
+
+def prepare_drive(drive_service):
+    """
+    Returns the ID of the MTE_Submissions folder, with every student folder
+    under it loaded into the folder cache.
+    """
+    mte_folder_id = get_or_create_folder(drive_service, 'MTE_Submissions')
+    try:
+        warm_folder_cache(drive_service, mte_folder_id)
+    except HttpError as error:
+        if not is_not_found(error):
+            raise
+        folder_cache.invalidate('MTE_Submissions')
+        mte_folder_id = get_or_create_folder(drive_service, 'MTE_Submissions')
+        warm_folder_cache(drive_service, mte_folder_id)
+    return mte_folder_id
+
+def process_messages(pipeline, gmail_service, msg_ids, mte_folder_id, processed_label_id):
+    """
+    Fetches the given messages, runs every .xlsx submission among them
+    through the pipeline and marks the ones whose reports were sent.
+    Returns (processed message IDs, pipeline results).
+    """
+    fetched = get_messages(gmail_service, msg_ids)
+    attachments = get_xlsx_attachments(gmail_service, fetched)
+    for msg_id in fetched:
+        if msg_id not in attachments:
+            print(f'No valid Excel file found in email {msg_id}.')
+
+    processed = []
+    digests = {msg_id: attachment_digest(data) for msg_id, (_, data) in attachments.items()}
+
+    def handle(pipeline, msg_id):
+        result = process_message(pipeline, fetched[msg_id], attachments[msg_id], mte_folder_id)
+        if result:
+            processed.append(result)
+        return result
 
-            mark_as_read(gmail_service, msg['id'])
+    try:
+        results = pipeline.run(handle, list(attachments))
+    finally:
+        # Commit whatever was sent, even if the run is interrupted
+        marked = mark_as_read(gmail_service, processed, label_id=processed_label_id)
+        get_ledger().mark([(msg_id, digests[msg_id]) for msg_id in marked])
+    return processed, results
 
-        else:
-            print('No valid Excel file found in the email.')
+
+def main(limits=None):
+    gmail_service, drive_service = authenticate_services()
+    processed_label_id = get_or_create_label(gmail_service)
+    messages = get_unread_messages(gmail_service, query=UNPROCESSED_QUERY)
+    print(f'Found {len(messages)} unread messages.')
+
+    mte_folder_id = prepare_drive(drive_service)
+    with StagedPipeline(limits) as pipeline:
+        processed, results = process_messages(
+            pipeline, gmail_service, [msg['id'] for msg in messages], mte_folder_id, processed_label_id
+        )
+
+    failed = [msg_id for msg_id, _, error in results if error]
+    print(f'Processed {len(processed)} of {len(messages)} messages, {len(failed)} failed.')
+    get_metrics().write_textfile()
+    return results
 
 
 if __name__ == '__main__':
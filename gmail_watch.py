@@ -0,0 +1,271 @@
+# gmail_watch.py
+"""
+Long-running mode for the Gmail integration. Authenticates once and keeps
+the Gmail/Drive services and the pipeline's worker pools warm, then picks up
+new submissions incrementally with users.history.list from the last stored
+historyId instead of listing every unread message on each run.
+
+The mailbox is checked every poll interval, or at once when a Pub/Sub push
+notification arrives on the optional local HTTP endpoint (see GMAIL_WATCH in
+config.py), so a report goes out seconds after the submission arrives.
+
+    python gmail_watch.py
+    python gmail_watch.py --poll-interval 10 --push-port 8080
+"""
+import argparse
+import base64
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from googleapiclient.errors import HttpError
+from config import GMAIL_WATCH
+from metrics import get_metrics
+from gmail_integration import (
+    UNPROCESSED_QUERY, authenticate_services, get_or_create_label, get_unread_messages,
+    is_not_found, prepare_drive, process_messages, user_id
+)
+from pipeline import StagedPipeline
+
+
+class HistoryState:
+    """
+    The last Gmail historyId whose messages have all been handed to the
+    pipeline, stored as a small JSON file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def get(self):
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file).get("history_id")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading Gmail history state: {e}")
+            return None
+
+    def set(self, history_id):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({"history_id": str(history_id), "updated": time.time()}, file)
+        os.replace(tmp_path, self.path)
+
+
+def get_history_id(service):
+    """
+    Returns the mailbox's current historyId.
+    """
+    return service.users().getProfile(userId=user_id).execute()['historyId']
+
+
+def list_new_messages(service, start_history_id, skip_label_id=None):
+    """
+    Returns (message IDs, latest historyId) for the unread inbox messages
+    added since start_history_id, following nextPageToken. Messages that
+    carry skip_label_id are left out.
+
+    Raises HttpError 404 when start_history_id is too old for Gmail to
+    answer; the caller falls back to a full listing.
+    """
+    msg_ids = []
+    seen = set()
+    history_id = start_history_id
+    page_token = None
+    while True:
+        response = service.users().history().list(
+            userId=user_id, startHistoryId=start_history_id, historyTypes=['messageAdded'],
+            labelId='INBOX', maxResults=500, pageToken=page_token
+        ).execute()
+        for record in response.get('history', []):
+            for added in record.get('messagesAdded', []):
+                message = added['message']
+                labels = message.get('labelIds', [])
+                if 'UNREAD' not in labels or (skip_label_id and skip_label_id in labels):
+                    continue
+                if message['id'] not in seen:
+                    seen.add(message['id'])
+                    msg_ids.append(message['id'])
+        history_id = response.get('historyId', history_id)
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return msg_ids, history_id
+
+
+def start_watch(service, topic):
+    """
+    Asks Gmail to publish inbox changes to a Pub/Sub topic. The
+    registration lapses after seven days unless renewed.
+    """
+    return service.users().watch(
+        userId=user_id,
+        body={'topicName': topic, 'labelIds': ['INBOX'], 'labelFilterBehavior': 'INCLUDE'}
+    ).execute()
+
+
+def make_push_handler(on_notify, token=None):
+    """
+    Request handler for Pub/Sub push deliveries. Each valid delivery calls
+    on_notify(history_id) and is acknowledged with 204.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            if token and parse_qs(urlparse(self.path).query).get("token", [None])[0] != token:
+                self.send_response(403)
+                self.end_headers()
+                return
+            try:
+                envelope = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                data = json.loads(base64.b64decode(envelope["message"]["data"]))
+                history_id = data.get("historyId")
+            except Exception:
+                # Malformed deliveries are acknowledged so Pub/Sub does not redeliver them
+                history_id = None
+            on_notify(history_id)
+            self.send_response(204)
+            self.end_headers()
+
+    return Handler
+
+
+class GmailWatcher:
+    """
+    Runs the Gmail integration continuously. Each sync processes the
+    messages added since the stored historyId; a full unread listing is
+    used on first start, when the historyId has expired, and every
+    full_sync_interval seconds to retry messages that failed earlier.
+    """
+
+    def __init__(self, poll_interval=None, full_sync_interval=None, limits=None, history_path=None):
+        self.poll_interval = poll_interval or GMAIL_WATCH["poll_interval"]
+        self.full_sync_interval = full_sync_interval or GMAIL_WATCH["full_sync_interval"]
+        self.limits = limits
+        self.state = HistoryState(history_path or GMAIL_WATCH["history_path"])
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._last_full_sync = None
+        self._last_watch = None
+        self.mte_folder_id = None
+
+    def notify(self, history_id=None):
+        """
+        Wakes the watcher for an immediate sync.
+        """
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def full_sync(self, pipeline):
+        # Read the historyId first so mail arriving during the listing is seen by the next sync
+        history_id = get_history_id(self.gmail_service)
+        self.mte_folder_id = prepare_drive(self.drive_service)
+        messages = get_unread_messages(self.gmail_service, query=UNPROCESSED_QUERY)
+        print(f'Full sync: {len(messages)} unread messages.')
+        self._process(pipeline, [msg['id'] for msg in messages])
+        self.state.set(history_id)
+        self._last_full_sync = time.monotonic()
+
+    def sync(self, pipeline):
+        """
+        Processes whatever arrived since the last sync.
+        """
+        start_history_id = self.state.get()
+        due = self._last_full_sync is None or time.monotonic() - self._last_full_sync >= self.full_sync_interval
+        if start_history_id is None or due:
+            return self.full_sync(pipeline)
+        try:
+            msg_ids, history_id = list_new_messages(self.gmail_service, start_history_id, self.processed_label_id)
+        except HttpError as error:
+            if not is_not_found(error):
+                raise
+            print(f'History {start_history_id} has expired; running a full sync.')
+            return self.full_sync(pipeline)
+        if msg_ids:
+            print(f'{len(msg_ids)} new messages since history {start_history_id}.')
+            self._process(pipeline, msg_ids)
+        self.state.set(history_id)
+
+    def _process(self, pipeline, msg_ids):
+        if not msg_ids:
+            return
+        started = time.perf_counter()
+        processed, results = process_messages(
+            pipeline, self.gmail_service, msg_ids, self.mte_folder_id, self.processed_label_id
+        )
+        failed = [msg_id for msg_id, _, error in results if error]
+        print(f'Processed {len(processed)} of {len(msg_ids)} messages, {len(failed)} failed '
+              f'in {time.perf_counter() - started:.1f}s.')
+        get_metrics().write_textfile()
+
+    def _renew_watch(self, topic):
+        if self._last_watch is not None and time.monotonic() - self._last_watch < GMAIL_WATCH["watch_renew_interval"]:
+            return
+        response = start_watch(self.gmail_service, topic)
+        self._last_watch = time.monotonic()
+        print(f'Gmail push registered on {topic} until {response.get("expiration")}.')
+
+    def run(self, topic=None):
+        """
+        Syncs until stop() is called or the process is interrupted.
+        """
+        self.gmail_service, self.drive_service = authenticate_services()
+        self.processed_label_id = get_or_create_label(self.gmail_service)
+
+        with StagedPipeline(self.limits) as pipeline:
+            while not self._stop.is_set():
+                self._wake.clear()
+                try:
+                    if topic:
+                        self._renew_watch(topic)
+                    self.sync(pipeline)
+                except Exception as error:
+                    print(f'Error syncing mailbox: {error}')
+                self._wake.wait(self.poll_interval)
+
+
+def start_push_server(watcher, host=None, port=None, token=None):
+    """
+    Serves the Pub/Sub push endpoint on a background thread and returns the server.
+    """
+    server = ThreadingHTTPServer(
+        (host or GMAIL_WATCH["push_host"], port),
+        make_push_handler(watcher.notify, token or GMAIL_WATCH["push_token"])
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f'Listening for push notifications on http://{server.server_address[0]}:{server.server_address[1]}/')
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poll-interval", type=float, default=GMAIL_WATCH["poll_interval"],
+                        help="seconds between history syncs")
+    parser.add_argument("--push-port", type=int, default=GMAIL_WATCH["push_port"],
+                        help="serve a Pub/Sub push endpoint on this port")
+    parser.add_argument("--topic", default=GMAIL_WATCH["topic"],
+                        help="Pub/Sub topic to register with users.watch")
+    args = parser.parse_args(argv)
+
+    watcher = GmailWatcher(poll_interval=args.poll_interval)
+    server = start_push_server(watcher, port=args.push_port) if args.push_port else None
+    try:
+        watcher.run(topic=args.topic)
+    except KeyboardInterrupt:
+        print('Stopping.')
+    finally:
+        if server:
+            server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
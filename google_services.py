@@ -0,0 +1,114 @@
+# google_services.py
+import json
+import os
+import threading
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from config import GOOGLE_HTTP_TIMEOUT
+
+TOKEN_PATH = 'token.json'
+CLIENT_SECRETS_PATH = 'credentials.json'
+
+_token_lock = threading.Lock()
+
+
+def save_token(creds, path=TOKEN_PATH):
+    """
+    Writes the credentials to token.json atomically, so a crash or a
+    concurrent reader never sees a half-written file.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as token:
+        token.write(creds.to_json())
+    os.replace(tmp_path, path)
+
+
+class SharedCredentials(Credentials):
+    """
+    OAuth user credentials shared by every worker thread. Refreshes are
+    serialized: a thread that finds the token already replaced while it
+    waited for the lock reuses the new one, so an expired token is refreshed
+    (and token.json rewritten) once, not once per worker.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, request):
+        stale_token = self.token
+        with self._refresh_lock:
+            if self.token != stale_token and self.valid:
+                return
+            super().refresh(request)
+            with _token_lock:
+                save_token(self)
+
+
+def get_credentials(scopes):
+    """
+    Loads token.json, refreshing or re-running the OAuth flow when needed.
+    """
+    creds = None
+    if os.path.exists(TOKEN_PATH):
+        creds = SharedCredentials.from_authorized_user_file(TOKEN_PATH, scopes)
+    if creds and creds.valid:
+        return creds
+    if creds and creds.expired and creds.refresh_token:
+        from google.auth.transport.requests import Request
+        creds.refresh(Request())
+        return creds
+    # The OAuth flow (and requests-oauthlib) is only needed without a usable token
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_PATH, scopes)
+    creds = flow.run_local_server(port=0)
+    with _token_lock:
+        save_token(creds)
+    return SharedCredentials.from_authorized_user_info(json.loads(creds.to_json()), scopes)
+
+
+_documents = {}
+_documents_lock = threading.Lock()
+
+
+def discovery_document(name, version):
+    """
+    Returns the parsed discovery document bundled with googleapiclient,
+    read from disk once per process.
+    """
+    key = (name, version)
+    with _documents_lock:
+        if key not in _documents:
+            document = discovery_cache.get_static_doc(name, version)
+            if document is None:
+                raise ValueError(f"No bundled discovery document for {name} {version}")
+            _documents[key] = json.loads(document)
+        return _documents[key]
+
+
+_thread_state = threading.local()
+
+
+def thread_http(credentials):
+    """
+    Returns the calling thread's authorized HTTP client. httplib2 keeps
+    connections open per host, so each worker reuses its own keep-alive
+    connections; instances are never shared because httplib2 is not
+    thread-safe.
+    """
+    http = getattr(_thread_state, 'http', None)
+    if http is None or http.credentials is not credentials:
+        http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT))
+        _thread_state.http = http
+    return http
+
+
+def build_service(name, version, credentials):
+    """
+    Builds an API client for the calling thread from the cached discovery
+    document, without a discovery fetch or file read.
+    """
+    return build_from_document(discovery_document(name, version), http=thread_http(credentials))
@@ -0,0 +1,146 @@
+# groq_batch.py
+import json
+import time
+from groq import Groq
+from config import GROQ_BATCH, GROQ_RETRY
+from evaluator import (
+    build_prompt, evaluation_cache_key, get_result_cache, parse_feedback, _request_kwargs
+)
+from utils import get_api_key_from_json
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+_batch_client = None
+
+
+def get_batch_client():
+    """
+    Groq client for the batch endpoints. Unlike the chat client these calls
+    are not rate limited, so the SDK's own retries are left on.
+    """
+    global _batch_client
+    if _batch_client is None:
+        _batch_client = Groq(
+            api_key=get_api_key_from_json("GROQ_API_KEY"),
+            base_url=GROQ_BATCH["base_url"],
+            max_retries=GROQ_RETRY["max_retries"]
+        )
+    return _batch_client
+
+
+def build_batch_file(requests, selected_model):
+    """
+    Returns the JSONL batch input for {custom_id: mte_data}, one chat
+    completion request per submission with the same prompt as evaluate_mte.
+    """
+    lines = []
+    for custom_id, mte_data in requests.items():
+        lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": _request_kwargs(build_prompt(mte_data), selected_model)
+        }))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def submit_batch(batch_client, data, completion_window=None):
+    """
+    Uploads the JSONL input and starts a batch. Returns the batch ID.
+    """
+    input_file = batch_client.files.create(file=("mte_batch.jsonl", data), purpose="batch")
+    batch = batch_client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=completion_window or GROQ_BATCH["completion_window"]
+    )
+    return batch.id
+
+
+def wait_for_batch(batch_client, batch_id, poll_interval=None, timeout=None):
+    """
+    Polls until the batch reaches a terminal status and returns it.
+    Raises TimeoutError after timeout seconds.
+    """
+    poll_interval = poll_interval or GROQ_BATCH["poll_interval"]
+    started = time.monotonic()
+    while True:
+        batch = batch_client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        counts = getattr(batch, "request_counts", None)
+        if counts is not None:
+            print(f"Batch {batch_id} {batch.status}: {counts.completed}/{counts.total} done")
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Batch {batch_id} still {batch.status} after {timeout}s")
+        time.sleep(poll_interval)
+
+
+def read_batch_results(batch_client, batch):
+    """
+    Returns {custom_id: feedback} from the batch's output and error files.
+    Failed requests map to {"error": ...}.
+    """
+    results = {}
+    for file_id in (getattr(batch, "output_file_id", None), getattr(batch, "error_file_id", None)):
+        if not file_id:
+            continue
+        for line in batch_client.files.content(file_id).text().splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            custom_id = entry.get("custom_id")
+            response = entry.get("response") or {}
+            if entry.get("error") or response.get("status_code") != 200:
+                error = entry.get("error") or (response.get("body") or {}).get("error") or response
+                results.setdefault(custom_id, {"error": f"Batch request failed: {error}"})
+                continue
+            try:
+                output = response["body"]["choices"][0]["message"]["content"].strip()
+            except (KeyError, IndexError, TypeError, AttributeError):
+                results[custom_id] = {"error": "Malformed batch response."}
+                continue
+            results[custom_id] = parse_feedback(output)
+    return results
+
+
+def evaluate_batch(submissions, selected_model, refresh=False, poll_interval=None, timeout=None):
+    """
+    Evaluates {submission_id: mte_data} through the Groq Batch API and
+    returns {submission_id: feedback}.
+
+    Submissions in the result cache are answered from it, identical ones
+    are sent once (the cache key doubles as custom_id), and successful
+    results are written back to the cache.
+    """
+    cache = get_result_cache()
+    keys = {submission_id: evaluation_cache_key(mte_data, selected_model)
+            for submission_id, mte_data in submissions.items()}
+
+    results_by_key = {}
+    requests = {}
+    for submission_id, key in keys.items():
+        if key in results_by_key or key in requests:
+            continue
+        cached = cache.get(key) if cache and not refresh else None
+        if cached is not None:
+            results_by_key[key] = cached
+        else:
+            requests[key] = submissions[submission_id]
+
+    if requests:
+        batch_client = get_batch_client()
+        batch_id = submit_batch(batch_client, build_batch_file(requests, selected_model))
+        print(f"Submitted batch {batch_id} with {len(requests)} requests "
+              f"({len(submissions) - len(requests)} answered from cache or duplicates).")
+        batch = wait_for_batch(batch_client, batch_id, poll_interval=poll_interval, timeout=timeout)
+        print(f"Batch {batch_id} {batch.status}.")
+        returned = read_batch_results(batch_client, batch)
+        for key in requests:
+            feedback = returned.get(key, {"error": f"No result for request in batch {batch_id} ({batch.status})."})
+            if cache and "error" not in feedback:
+                cache.set(key, feedback)
+            results_by_key[key] = feedback
+
+    return {submission_id: results_by_key[key] for submission_id, key in keys.items()}
@@ -0,0 +1,109 @@
+# ledger.py
+import json
+import sqlite3
+import threading
+import time
+
+# Stages of one Gmail submission, in pipeline order
+STAGES = (
+    "fetched",
+    "parsed",
+    "evaluated",
+    "rendered",
+    "uploaded",
+    "sent_student",
+    "sent_mentors",
+    "marked",
+)
+
+
+class StageRecord:
+    def __init__(self, payload, data, completed):
+        self.payload = payload
+        self.data = data
+        self.completed = completed
+
+
+class Ledger:
+    """
+    SQLite record of the stages each submission has completed, keyed by
+    Gmail message ID and the SHA-256 of its attachment. A restarted run
+    reads it to skip finished stages: no second LLM call for an evaluated
+    submission, no second email to a student who already got the report.
+
+    Each stage can keep a JSON payload (parsed data, feedback) and a binary
+    blob (the rendered PDF); blobs are dropped once a message is marked.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stages ("
+                "msg_id TEXT NOT NULL, digest TEXT NOT NULL, stage TEXT NOT NULL, "
+                "payload TEXT, data BLOB, completed REAL NOT NULL, "
+                "PRIMARY KEY (msg_id, digest, stage))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def completed(self, msg_id, digest):
+        """
+        Returns {stage: StageRecord} for every stage already recorded,
+        in pipeline order.
+        """
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT stage, payload, data, completed FROM stages WHERE msg_id = ? AND digest = ?",
+                (msg_id, digest)
+            ).fetchall()
+        records = {
+            stage: StageRecord(json.loads(payload) if payload is not None else None, data, completed)
+            for stage, payload, data, completed in rows
+        }
+        return {stage: records[stage] for stage in STAGES if stage in records}
+
+    def record(self, msg_id, digest, stage, payload=None, data=None):
+        if stage not in STAGES:
+            raise ValueError(f"Unknown ledger stage: {stage}")
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stages (msg_id, digest, stage, payload, data, completed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (msg_id, digest, stage, json.dumps(payload) if payload is not None else None, data, time.time())
+            )
+
+    def mark(self, keys):
+        """
+        Records the "marked" stage for many (msg_id, digest) pairs and drops
+        their stored blobs, which are no longer needed to resume.
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO stages (msg_id, digest, stage, payload, data, completed) "
+                "VALUES (?, ?, 'marked', NULL, NULL, ?)",
+                [(msg_id, digest, now) for msg_id, digest in keys]
+            )
+            conn.executemany(
+                "UPDATE stages SET data = NULL WHERE msg_id = ? AND digest = ?",
+                list(keys)
+            )
+
+    def summary(self):
+        """
+        Returns {stage: number of submissions whose furthest stage it is}.
+        """
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        furthest = {}
+        with self._lock, self._connect() as conn:
+            for msg_id, digest, stage in conn.execute("SELECT msg_id, digest, stage FROM stages"):
+                key = (msg_id, digest)
+                if key not in furthest or order[stage] > order[furthest[key]]:
+                    furthest[key] = stage
+        counts = {}
+        for stage in furthest.values():
+            counts[stage] = counts.get(stage, 0) + 1
+        return counts
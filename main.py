@@ -109,9 +109,18 @@
 #     st.info("📂 Please upload your MTE Excel file from the sidebar to begin.")
 
 
+import hashlib
+import io
 import streamlit as st
 from utils import extract_mte_data
-from evaluator import evaluate_mte, AVAILABLE_MODELS
+from evaluator import stream_evaluate_mte, stream_evaluate_mte_sectioned, AVAILABLE_MODELS
+
+
+# Streamlit reruns this script on every widget interaction, so the upload is
+# parsed once per content hash and each evaluation is kept in session state.
+@st.cache_data(show_spinner=False, max_entries=32)
+def parse_upload(data):
+    return extract_mte_data(io.BytesIO(data))
 
 # Set wide layout
 st.set_page_config(page_title="🌟 MTE Rating System", layout="wide")
@@ -123,14 +132,40 @@ st.title("🌟 Monthly Thinking Exercise (MTE) Evaluator")
 st.sidebar.title("⚙️ Settings")
 uploaded_file = st.sidebar.file_uploader("📤 Upload your MTE Excel file", type=["xlsx"])
 selected_model = st.sidebar.selectbox("🤖 Choose a Model", AVAILABLE_MODELS)
+evaluation_mode = st.sidebar.radio("🧩 Evaluation Mode", ["Single request", "Per section (parallel)"])
+stream_evaluate = stream_evaluate_mte_sectioned if evaluation_mode == "Per section (parallel)" else stream_evaluate_mte
+reevaluate = st.sidebar.button("🔄 Re-evaluate", disabled=not uploaded_file)
+
+if "evaluations" not in st.session_state:
+    st.session_state.evaluations = {}
 
 # Main App
 if uploaded_file:
-    mte_data = extract_mte_data(uploaded_file)
+    upload_bytes = uploaded_file.getvalue()
+    mte_data = parse_upload(upload_bytes)
 
     if "error" not in mte_data:
-        with st.spinner("🧠 Analyzing your responses..."):
-            feedback = evaluate_mte(mte_data, selected_model)
+        evaluation_key = (hashlib.sha256(upload_bytes).hexdigest(), selected_model, evaluation_mode)
+        feedback = st.session_state.evaluations.get(evaluation_key)
+
+        if feedback is None or reevaluate:
+            with st.spinner("🧠 Analyzing your responses..."):
+                # Show each section as soon as the model has finished it
+                live_sections = st.empty()
+                completed_sections = []
+                feedback = {"error": "No response from model."}
+                for event in stream_evaluate(mte_data, selected_model, refresh=reevaluate):
+                    if event[0] == "section":
+                        _, section, details = event
+                        completed_sections.append(f"✅ **{section.replace('_', ' ').title()}** (Score: {details.get('score', 'N/A')}/10)")
+                        live_sections.markdown("\n\n".join(completed_sections))
+                    else:
+                        feedback = event[1]
+                live_sections.empty()
+            st.session_state.evaluations[evaluation_key] = feedback
+            just_evaluated = True
+        else:
+            just_evaluated = False
 
         if "error" not in feedback:
             st.success("✅ Evaluation complete!")
@@ -142,8 +177,8 @@ if uploaded_file:
             # Show Progress Bar
             st.progress(overall_score / 10)
 
-            # 🎉 Confetti Celebration if score > 8
-            if overall_score > 8:
+            # 🎉 Confetti Celebration if score > 8 (once, not on every rerun)
+            if overall_score > 8 and just_evaluated:
                 st.balloons()
                 st.toast("🎉 Fantastic Work! You're excelling!", icon="🎯")
 
@@ -211,6 +246,8 @@ if uploaded_file:
 
         else:
             st.error(f"❗ Error in Evaluation: {feedback['error']}")
+            if feedback.get("raw_output"):
+                st.text_area("Model output", feedback["raw_output"], height=400)
 
     else:
         st.error(f"❗ Error reading MTE file: {mte_data['error']}")
@@ -0,0 +1,185 @@
+# metrics.py
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from config import METRICS
+
+
+class Histogram:
+    """
+    Cumulative Prometheus-style histogram over fixed upper bounds.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{str(value)}"' for key, value in labels.items()) + "}"
+
+
+class Metrics:
+    """
+    Timings, sizes and outcomes of the pipeline stages, plus LLM token usage.
+
+    Every stage call is appended to trace_path as one JSON line. Aggregates
+    are kept in memory and written by write_textfile() in the Prometheus
+    textfile format, for node_exporter's textfile collector or a quick look.
+    Either path may be None to turn that output off. Safe to share between
+    threads; stages that run on worker processes are timed by the caller.
+    """
+
+    def __init__(self, trace_path=None, textfile_path=None, buckets=None):
+        self.trace_path = trace_path
+        self.textfile_path = textfile_path
+        self.buckets = tuple(buckets or METRICS["buckets"])
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._bytes = {}
+        self._tokens = {}
+        self._started = time.time()
+
+    def record(self, stage, seconds, outcome="ok", **fields):
+        """
+        Records one finished stage call. A "bytes" field also counts
+        towards mte_stage_bytes_total.
+        """
+        with self._lock:
+            key = (stage, outcome)
+            if key not in self._durations:
+                self._durations[key] = Histogram(self.buckets)
+            self._durations[key].observe(seconds)
+            if fields.get("bytes"):
+                self._bytes[stage] = self._bytes.get(stage, 0) + fields["bytes"]
+        self._trace({"stage": stage, "seconds": round(seconds, 4), "outcome": outcome, **fields})
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """
+        Times the block as one call of the named stage. The yielded dict
+        takes extra fields (sizes, counts); setting span["outcome"] marks a
+        call that failed without raising. Exceptions are recorded as
+        outcome "error" and re-raised.
+        """
+        span = dict(fields)
+        started = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.setdefault("error", f"{type(e).__name__}: {e}")
+            span["outcome"] = "error"
+            raise
+        finally:
+            outcome = span.pop("outcome", "ok")
+            self.record(name, time.perf_counter() - started, outcome, **span)
+
+    def add_tokens(self, model, prompt_tokens, completion_tokens, estimated=False):
+        """
+        Counts the tokens of one completion, as reported in its usage or,
+        when estimated, as approximated by the caller.
+        """
+        with self._lock:
+            for kind, value in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+                key = (model, kind)
+                self._tokens[key] = self._tokens.get(key, 0) + (value or 0)
+        self._trace({
+            "stage": "completion", "model": model, "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens, "estimated": estimated
+        })
+
+    def _trace(self, entry):
+        if not self.trace_path:
+            return
+        entry = {"time": datetime.now().isoformat(timespec='milliseconds'), **entry}
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self.trace_path) or '.', exist_ok=True)
+                with open(self.trace_path, 'a') as f:
+                    f.write(json.dumps(entry, default=str) + "\n")
+        except Exception as error:
+            print(f'Error writing metrics trace: {error}')
+
+    def render(self):
+        """
+        Returns the aggregates in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP mte_stage_duration_seconds Time spent in each pipeline stage call.",
+                "# TYPE mte_stage_duration_seconds histogram",
+            ]
+            for (stage, outcome), histogram in sorted(self._durations.items()):
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"mte_stage_duration_seconds_bucket{_labels(stage=stage, outcome=outcome, le=bound)} {count}")
+                lines.append(f"mte_stage_duration_seconds_bucket{_labels(stage=stage, outcome=outcome, le='+Inf')} {histogram.count}")
+                lines.append(f"mte_stage_duration_seconds_sum{_labels(stage=stage, outcome=outcome)} {histogram.sum:.6f}")
+                lines.append(f"mte_stage_duration_seconds_count{_labels(stage=stage, outcome=outcome)} {histogram.count}")
+
+            lines += [
+                "# HELP mte_stage_bytes_total Bytes handled per stage (attachments, PDFs, uploads, emails).",
+                "# TYPE mte_stage_bytes_total counter",
+            ]
+            for stage, total in sorted(self._bytes.items()):
+                lines.append(f"mte_stage_bytes_total{_labels(stage=stage)} {total}")
+
+            lines += [
+                "# HELP mte_llm_tokens_total Tokens used by model completions.",
+                "# TYPE mte_llm_tokens_total counter",
+            ]
+            for (model, kind), total in sorted(self._tokens.items()):
+                lines.append(f"mte_llm_tokens_total{_labels(model=model, kind=kind)} {total}")
+
+            lines += [
+                "# HELP mte_metrics_start_time_seconds When these counters started.",
+                "# TYPE mte_metrics_start_time_seconds gauge",
+                f"mte_metrics_start_time_seconds {self._started:.3f}",
+                "# HELP mte_metrics_written_time_seconds When this file was written.",
+                "# TYPE mte_metrics_written_time_seconds gauge",
+                f"mte_metrics_written_time_seconds {time.time():.3f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path=None):
+        """
+        Atomically rewrites the Prometheus textfile, so a collector never
+        reads a half-written file.
+        """
+        path = path or self.textfile_path
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except Exception as error:
+            print(f'Error writing metrics textfile: {error}')
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """
+    Returns the process-wide Metrics configured by METRICS in config.py.
+    """
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(METRICS["trace_path"], METRICS["textfile_path"], METRICS["buckets"])
+        return _metrics
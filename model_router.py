@@ -0,0 +1,169 @@
+# model_router.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from config import MODEL_ROUTING
+from evaluator import AVAILABLE_MODELS, cached_evaluation, evaluate_mte
+
+
+class ModelStats:
+    """
+    Rolling latency and outcome window for one model.
+    """
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+
+    def record(self, seconds, ok):
+        if ok:
+            self.latencies.append(seconds)
+        self.outcomes.append(ok)
+
+    def p95(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def success_rate(self):
+        if not self.outcomes:
+            return 1.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+
+class ModelRouter:
+    """
+    Sends an evaluation to the preferred model and falls back to the next
+    model on error or timeout. When the first model has not answered within
+    its p95 latency, a hedged request is sent to the fastest other model and
+    whichever succeeds first wins.
+    """
+
+    def __init__(self, models, settings=None):
+        self.models = list(models)
+        self.settings = {**MODEL_ROUTING, **(settings or {})}
+        self._lock = threading.Lock()
+        self._stats = {model: ModelStats(self.settings["window"]) for model in self.models}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings["max_workers"],
+            thread_name_prefix="mte-router"
+        )
+
+    def record(self, model, seconds, ok):
+        with self._lock:
+            self._stats.setdefault(model, ModelStats(self.settings["window"])).record(seconds, ok)
+
+    def stats(self):
+        """
+        Returns {model: {"p95": seconds or None, "success_rate": 0..1, "samples": n}}.
+        """
+        with self._lock:
+            return {
+                model: {"p95": stat.p95(), "success_rate": stat.success_rate(), "samples": len(stat.outcomes)}
+                for model, stat in self._stats.items()
+            }
+
+    def order(self, preferred=None):
+        """
+        Returns the models to try, best first: the preferred model, then the
+        rest by success rate and p95 latency.
+        """
+        stats = self.stats()
+
+        def rank(model):
+            p95 = stats.get(model, {}).get("p95")
+            return (-stats.get(model, {}).get("success_rate", 1.0), p95 if p95 is not None else float("inf"))
+
+        others = sorted((model for model in self.models if model != preferred), key=rank)
+        return ([preferred] if preferred else []) + others
+
+    def hedge_deadline(self, model):
+        stat = self.stats().get(model, {})
+        if stat.get("samples", 0) < self.settings["min_samples"] or stat.get("p95") is None:
+            return self.settings["default_hedge_after"]
+        return stat["p95"]
+
+    def _evaluate(self, model, mte_data, refresh):
+        if not refresh:
+            cached = cached_evaluation(mte_data, model)
+            if cached is not None:
+                # Not a latency sample: cache hits would pull p95, and with it the hedge deadline, towards zero
+                return cached
+        started = time.perf_counter()
+        result = evaluate_mte(
+            mte_data, model, refresh=refresh,
+            timeout=self.settings["timeout"], stream=self.settings["stream"]
+        )
+        self.record(model, time.perf_counter() - started, "error" not in result)
+        return result
+
+    def evaluate(self, mte_data, preferred=None, refresh=False):
+        """
+        Evaluates mte_data, trying models in order until one succeeds.
+        Returns the feedback dict, or {"error": ...} if every model failed.
+        """
+        return self.evaluate_with_model(mte_data, preferred, refresh)[0]
+
+    def evaluate_with_model(self, mte_data, preferred=None, refresh=False):
+        """
+        Same as evaluate, but returns (feedback, model) with the model that
+        answered, which differs from preferred after a fallback or a won
+        hedge. model is None if every model failed.
+        """
+        remaining = self.order(preferred)
+        futures = {}
+        errors = []
+        hedged = not self.settings["hedge"]
+
+        def launch(model):
+            futures[self._executor.submit(self._evaluate, model, mte_data, refresh)] = model
+
+        launch(remaining.pop(0))
+        pending = set(futures)
+        finished = set()
+        while pending:
+            deadline = None
+            if not hedged and remaining and len(pending) == 1:
+                deadline = self.hedge_deadline(futures[next(iter(pending))])
+            done, pending = wait(pending, timeout=deadline, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slower than its p95: race the fastest remaining model
+                hedged = True
+                hedge_model = min(remaining, key=lambda model: self.hedge_deadline(model))
+                remaining.remove(hedge_model)
+                print(f"Hedging slow request with {hedge_model}")
+                launch(hedge_model)
+                pending = set(futures) - finished
+                continue
+
+            finished |= done
+            for future in done:
+                result = future.result()
+                if "error" not in result:
+                    return result, futures[future]
+                errors.append(f"{futures[future]}: {result['error']}")
+
+            if not pending and remaining:
+                model = remaining.pop(0)
+                print(f"Falling back to {model}")
+                launch(model)
+                pending = set(futures) - finished
+
+        return {"error": "All models failed. " + " | ".join(errors)}, None
+
+
+_router = None
+_router_lock = threading.Lock()
+
+def get_router():
+    """
+    Returns the process-wide router over AVAILABLE_MODELS.
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(AVAILABLE_MODELS)
+        return _router
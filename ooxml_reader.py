@@ -0,0 +1,186 @@
+# ooxml_reader.py
+"""
+Reads the first worksheet of an .xlsx straight from the zip archive with
+iterparse, without building an openpyxl object model. Produces the same
+(values, border_rows) grid as utils.read_sheet_grid.
+"""
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+WORKSHEET_REL = REL_NS + "/worksheet"
+
+CELL = f"{{{MAIN_NS}}}c"
+ROW = f"{{{MAIN_NS}}}row"
+VALUE = f"{{{MAIN_NS}}}v"
+FORMULA = f"{{{MAIN_NS}}}f"
+INLINE = f"{{{MAIN_NS}}}is"
+TEXT = f"{{{MAIN_NS}}}t"
+RUN = f"{{{MAIN_NS}}}r"
+STRING_ITEM = f"{{{MAIN_NS}}}si"
+MERGE_CELL = f"{{{MAIN_NS}}}mergeCell"
+
+BORDER_SIDES = ("left", "right", "top", "bottom")
+COORDINATE = re.compile(r"^([A-Z]{1,3})([0-9]+)$")
+
+
+class UnsupportedWorkbook(Exception):
+    """
+    Raised for workbook features this reader leaves to openpyxl.
+    """
+
+
+def column_index(letters, _cache={}):
+    index = _cache.get(letters)
+    if index is None:
+        index = 0
+        for letter in letters:
+            index = index * 26 + ord(letter) - 64
+        _cache[letters] = index
+    return index
+
+
+def parse_coordinate(ref):
+    match = COORDINATE.match(ref or "")
+    if not match:
+        raise UnsupportedWorkbook(f"Unexpected cell reference: {ref!r}")
+    return int(match.group(2)), column_index(match.group(1))
+
+
+def text_content(element):
+    """
+    Plain text of a string item, as openpyxl's Text.content: the direct
+    <t> plus the <t> of each rich-text run; phonetic runs are ignored.
+    """
+    snippets = []
+    plain = element.find(TEXT)
+    if plain is not None and plain.text:
+        snippets.append(plain.text)
+    for run in element.iterfind(RUN):
+        text = run.findtext(TEXT)
+        if text:
+            snippets.append(text)
+    return "".join(snippets)
+
+
+def first_worksheet_path(archive):
+    """
+    Resolves the part name of the first worksheet listed in workbook.xml.
+    """
+    rels = {}
+    with archive.open("xl/_rels/workbook.xml.rels") as source:
+        for _, element in iterparse(source):
+            if element.tag == f"{{{PKG_REL_NS}}}Relationship":
+                rels[element.get("Id")] = (element.get("Type"), element.get("Target"))
+
+    with archive.open("xl/workbook.xml") as source:
+        for _, element in iterparse(source):
+            if element.tag == f"{{{MAIN_NS}}}sheet":
+                rel_type, target = rels.get(element.get(f"{{{REL_NS}}}id"), (None, None))
+                if rel_type != WORKSHEET_REL:
+                    continue
+                if target.startswith("/"):
+                    return target.lstrip("/")
+                return posixpath.normpath(posixpath.join("xl", target))
+    raise UnsupportedWorkbook("Workbook has no worksheet")
+
+
+def read_shared_strings(archive):
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as source:
+        for _, element in iterparse(source):
+            if element.tag == STRING_ITEM:
+                strings.append(text_content(element).replace("x005F_", ""))
+                element.clear()
+    return strings
+
+
+def read_border_styles(archive):
+    """
+    Returns one frozenset of styled border sides per cellXfs entry,
+    i.e. indexed by a cell's s attribute.
+    """
+    borders = []
+    xf_border_ids = []
+    with archive.open("xl/styles.xml") as source:
+        stack = []
+        for event, element in iterparse(source, events=("start", "end")):
+            name = element.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                stack.append(name)
+                continue
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if name == "border" and parent == "borders":
+                sides = frozenset(
+                    side for side in BORDER_SIDES
+                    if (element.find(f"{{{MAIN_NS}}}{side}") is not None
+                        and element.find(f"{{{MAIN_NS}}}{side}").get("style") not in (None, "none"))
+                )
+                borders.append(sides)
+            elif name == "xf" and parent == "cellXfs":
+                xf_border_ids.append(int(element.get("borderId", 0)))
+    return [borders[border_id] if border_id < len(borders) else frozenset() for border_id in xf_border_ids]
+
+
+def read_sheet_grid(file_path):
+    """
+    Streams the first worksheet's XML once and returns (values, border_rows,
+    border_sides, merged_ranges). Raises UnsupportedWorkbook for formulas,
+    strict-namespace files or cells without coordinates.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_path = first_worksheet_path(archive)
+        shared_strings = read_shared_strings(archive)
+        styles = read_border_styles(archive)
+
+        values = {}
+        border_rows = {}
+        border_sides = {}
+        merged_ranges = []
+        with archive.open(sheet_path) as source:
+            for _, element in iterparse(source):
+                tag = element.tag
+                if tag == CELL:
+                    if element.find(FORMULA) is not None:
+                        raise UnsupportedWorkbook("Formula cells")
+                    row, column = parse_coordinate(element.get("r"))
+                    style_id = int(element.get("s", 0))
+                    sides = styles[style_id] if style_id < len(styles) else frozenset()
+                    if sides:
+                        border_rows[row] = border_rows.get(row, 0) | (1 << column)
+                        border_sides[(row, column)] = sides
+
+                    data_type = element.get("t", "n")
+                    text = None
+                    if data_type == "inlineStr":
+                        inline = element.find(INLINE)
+                        if inline is not None:
+                            text = text_content(inline)
+                    elif data_type in ("s", "str", "e"):
+                        raw = element.findtext(VALUE) or None
+                        if raw is not None:
+                            text = shared_strings[int(raw)] if data_type == "s" else raw
+                    if text:
+                        values[(row, column)] = text
+                    element.clear()
+                elif tag == ROW:
+                    element.clear()
+                elif tag == MERGE_CELL:
+                    start, _, end = element.get("ref", "").partition(":")
+                    if end:
+                        min_row, min_col = parse_coordinate(start)
+                        max_row, max_col = parse_coordinate(end)
+                        merged_ranges.append((min_row, min_col, max_row, max_col))
+                elif tag.endswith("}worksheet") and not tag.startswith(f"{{{MAIN_NS}}}"):
+                    raise UnsupportedWorkbook(f"Unsupported namespace: {tag}")
+
+    if not styles:
+        raise UnsupportedWorkbook("No cell styles")
+    return values, border_rows, border_sides, merged_ranges
@@ -0,0 +1,205 @@
+# pdf_renderer.py
+import copy
+import io
+import os
+import threading
+from datetime import datetime
+from fontTools import subset as ftsubset
+from fontTools import ttLib
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+from fpdf.fonts import SubsetMap
+
+FONT_DIR = 'fonts'
+FONT_FAMILY = 'DejaVu'
+FONT_FILES = {
+    '': 'DejaVuSans.ttf',
+    'B': 'DejaVuSans-Bold.ttf',
+}
+# Code points whose glyphs go into the pre-built common subset: Latin,
+# Latin-1 and Latin Extended-A/B, general punctuation (bullets, dashes,
+# quotes) and currency signs.
+COMMON_RANGES = [(0x20, 0x24F), (0x2000, 0x206F), (0x20A0, 0x20CF)]
+
+
+class ReportRenderer:
+    """
+    Renders MTE feedback reports to PDF bytes.
+
+    The TTF files are read and parsed (cmap, glyph widths, descriptor) once,
+    when the renderer is built, and each report starts from a shallow copy
+    of those parsed fonts with its own subset map.
+
+    On output fpdf2 subsets the font in place, so every report needs its own
+    TTFont to subset. Reports whose glyphs all fall in COMMON_RANGES get one
+    built from a pre-made, unhinted subset of those ranges (about a tenth of
+    DejaVu) instead of the full file; any other report gets its exact glyph
+    set cut from the full TTF. Either way only the used glyphs are embedded.
+    """
+
+    def __init__(self, font_dir=FONT_DIR):
+        self._font_data = {}
+        self._common_data = {}
+        self._common_glyphs = {}
+        template = FPDF()
+        for style, filename in FONT_FILES.items():
+            path = os.path.join(font_dir, filename)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Font file not found at {path}.")
+            with open(path, 'rb') as f:
+                self._font_data[style] = f.read()
+            template.add_font(FONT_FAMILY, style, path)
+        self._fonts = {
+            style: template.fonts[f"{FONT_FAMILY.lower()}{style}"] for style in FONT_FILES
+        }
+        for style, parsed in self._fonts.items():
+            glyph_names = [
+                name for codepoint, name in parsed.cmap.items()
+                if any(low <= codepoint <= high for low, high in COMMON_RANGES)
+            ]
+            # fpdf2 asks the subsetter for glyphs by name, so the saved
+            # subset must keep them; otherwise reloading it renames many
+            # glyphs (twosuperior, Scommaaccent, ...) to glyphNNNNN
+            font = self._subset(self._font_data[style], glyph_names, keep_glyph_names=True)
+            output = io.BytesIO()
+            font.save(output)
+            self._common_data[style] = output.getvalue()
+            # Checked against the names the saved subset actually reloads with
+            reloaded = ttLib.TTFont(io.BytesIO(self._common_data[style]), lazy=True)
+            self._common_glyphs[style] = frozenset(reloaded.getGlyphOrder())
+
+    @staticmethod
+    def _subset(data, glyph_names, keep_glyph_names=False):
+        font = ttLib.TTFont(io.BytesIO(data), recalcTimestamp=False, lazy=True)
+        # fpdf2's output options, minus the TrueType hinting programs: viewers
+        # rasterise at high resolution and the instructions are a third of
+        # the embedded font. FFTM is dropped by fpdf2 as well.
+        options = ftsubset.Options(notdef_outline=True, recommended_glyphs=True)
+        options.drop_tables += ["FFTM"]
+        options.hinting = False
+        options.glyph_names = keep_glyph_names
+        subsetter = ftsubset.Subsetter(options)
+        subsetter.populate(glyphs=glyph_names)
+        subsetter.subset(font)
+        return font
+
+    def _new_document(self):
+        pdf = FPDF()
+        for style, parsed in self._fonts.items():
+            font = copy.copy(parsed)
+            font.missing_glyphs = []
+            font.biggest_size_pt = 0
+            font.subset = SubsetMap(font)
+            pdf.fonts[font.fontkey] = font
+        return pdf
+
+    def _output(self, pdf):
+        # Never let fpdf2 subset the shared parsed fonts in place
+        for style in FONT_FILES:
+            font = pdf.fonts[f"{FONT_FAMILY.lower()}{style}"]
+            glyph_names = font.subset.get_all_glyph_names()
+            if self._common_glyphs[style].issuperset(glyph_names):
+                font.ttfont = ttLib.TTFont(io.BytesIO(self._common_data[style]), recalcTimestamp=False, lazy=True)
+            else:
+                font.ttfont = self._subset(self._font_data[style], glyph_names)
+        return bytes(pdf.output())
+
+    def render(self, feedback):
+        # Extract relevant data
+        section_scores = feedback.get("section_scores", {})
+        strengths = feedback.get("strengths", [])
+        areas_for_improvement = feedback.get("areas_for_improvement", [])
+        suggestions = feedback.get("suggestions", [])
+
+        # Metadata
+        student_name = feedback.get("student_name", "N/A")
+        submission_month = feedback.get("submission_month", "N/A")
+        college_name = feedback.get("college_name", "N/A")
+        student_class = feedback.get("class_info", "N/A")
+        generation_date = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+
+        # Initialize PDF
+        pdf = self._new_document()
+        pdf.add_page()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.set_font(FONT_FAMILY, '', 16)
+
+        # Title
+        pdf.cell(0, 10, "MTE Evaluation Report", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+        pdf.ln(10)
+        pdf.set_font(FONT_FAMILY, '', 12)
+
+        # Student details
+        student_details = [
+            f"Name of the Student: {student_name}",
+            f"Submission Month: {submission_month}",
+            f"College Name: {college_name}",
+            f"Class: {student_class}",
+            f"PDF Generated On: {generation_date}"
+        ]
+        for line in student_details:
+            pdf.multi_cell(0, 8, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+        pdf.ln(5)
+
+        # Long unbroken words (URLs, IDs) are set smaller so they fit the line
+        def add_line(text):
+            if max((len(word) for word in text.split()), default=0) > 80:
+                pdf.set_font(FONT_FAMILY, '', 10)
+                pdf.multi_cell(0, 8, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                pdf.set_font(FONT_FAMILY, '', 12)
+            else:
+                pdf.multi_cell(0, 8, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+        # Utility function for bullets
+        def add_bullet_section(title, items):
+            if not items:
+                return
+            pdf.set_font(FONT_FAMILY, 'B', 12)
+            pdf.cell(0, 10, f"{title}:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.set_font(FONT_FAMILY, '', 12)
+            for item in items:
+                add_line(f"• {item}")
+            pdf.ln(3)
+
+        # Add bullet sections
+        add_bullet_section("Strengths", strengths)
+        add_bullet_section("Areas for Improvement", areas_for_improvement)
+        add_bullet_section("Suggestions", suggestions)
+
+        # Section-wise Scores
+        if section_scores:
+            pdf.set_font(FONT_FAMILY, 'B', 12)
+            pdf.cell(0, 10, "Section-wise Evaluation:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.set_font(FONT_FAMILY, '', 12)
+            pdf.ln(3)
+            for section, details in section_scores.items():
+                section_title = section.replace("_", " ").title()
+                pdf.set_font(FONT_FAMILY, 'B', 12)
+                pdf.cell(0, 10, f"{section_title} (Score: {details['score']})", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                pdf.set_font(FONT_FAMILY, '', 12)
+                lines = [
+                    f"• Reason: {details['reason']}",
+                    f"• Feedback: {details['feedback']}",
+                    f"• Suggestions: {details['suggestions']}"
+                ]
+                for line in lines:
+                    if line.strip():
+                        add_line(line)
+                pdf.ln(3)
+
+        return self._output(pdf)
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+def get_renderer():
+    """
+    Returns the process-wide renderer, parsing the fonts on first use.
+    """
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ReportRenderer()
+        return _renderer
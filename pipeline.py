@@ -0,0 +1,106 @@
+# pipeline.py
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from config import PIPELINE_LIMITS
+from render_pool import init_worker as init_render_worker
+
+IO_STAGES = ("gmail", "evaluate", "drive")
+CPU_STAGES = ("parse", "render")
+
+# Per-process setup for CPU stages, run once when each worker starts
+CPU_INITIALIZERS = {
+    "render": init_render_worker,
+}
+
+# CPU workers start lazily, on the first submit, when the I/O threads are
+# already running; forking a multi-threaded process can deadlock the child
+# on a lock held by another thread. forkserver forks from a clean
+# single-threaded server instead (spawn where forkserver is unavailable).
+CPU_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+# Imported once in the fork server, so each worker starts with them loaded
+CPU_PRELOAD = ["utils", "openpyxl", "pdf_renderer"]
+
+
+class StagedPipeline:
+    """
+    Runs submissions through a bounded worker pool per stage.
+    I/O-bound stages (Gmail, Groq, Drive) use threads, CPU-bound stages
+    (openpyxl parsing, fpdf rendering) use processes.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = {**PIPELINE_LIMITS, **(limits or {})}
+        self._executors = {}
+        mp_context = multiprocessing.get_context(CPU_START_METHOD)
+        if CPU_START_METHOD == "forkserver":
+            mp_context.set_forkserver_preload(CPU_PRELOAD)
+        for stage in IO_STAGES:
+            if self.limits.get(stage, 0) > 0:
+                self._executors[stage] = ThreadPoolExecutor(
+                    max_workers=self.limits[stage],
+                    thread_name_prefix=f"mte-{stage}"
+                )
+        for stage in CPU_STAGES:
+            if self.limits.get(stage, 0) > 0:
+                self._executors[stage] = ProcessPoolExecutor(
+                    max_workers=self.limits[stage],
+                    mp_context=mp_context,
+                    initializer=CPU_INITIALIZERS.get(stage)
+                )
+
+    def submit(self, stage, fn, *args, **kwargs):
+        """
+        Schedules fn on the pool of the given stage and returns a Future.
+        Stages without a pool run inline in the calling thread.
+        """
+        if stage not in IO_STAGES + CPU_STAGES:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+        executor = self._executors.get(stage)
+        if executor is not None:
+            return executor.submit(fn, *args, **kwargs)
+
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def call(self, stage, fn, *args, **kwargs):
+        """
+        Runs fn on the given stage and waits for its result.
+        """
+        return self.submit(stage, fn, *args, **kwargs).result()
+
+    def run(self, handler, items):
+        """
+        Calls handler(pipeline, item) for every item, with at most
+        limits["in_flight"] items in progress at once.
+
+        A failing item never stops the others: every item gets a
+        (item, result, error) tuple in the returned list, in completion order.
+        """
+        results = []
+        in_flight = max(1, self.limits.get("in_flight", 1))
+        with ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix="mte-item") as coordinator:
+            futures = {coordinator.submit(handler, self, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    results.append((item, future.result(), None))
+                except Exception as e:
+                    print(f"Pipeline error for {item}: {e}")
+                    results.append((item, None, e))
+        return results
+
+    def shutdown(self, wait=True):
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+        self._executors.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=exc_type is None)
+        return False
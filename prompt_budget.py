@@ -0,0 +1,175 @@
+# prompt_budget.py
+import re
+from functools import lru_cache
+from config import PROMPT_BUDGET
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_EMPTY_CELLS = re.compile(r"(?:\s*\|\s*)+\|")
+
+# Tokens kept free for the omission marker
+MARKER_TOKENS = 16
+# A piece that does not fit whole is only cut down if this much room is left for it
+MIN_PIECE_TOKENS = 24
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """
+    Returns the tiktoken encoding from PROMPT_BUDGET, or None if tiktoken
+    is not installed.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding(PROMPT_BUDGET["encoding"])
+
+
+def count_tokens(text):
+    """
+    Counts the tokens of text locally. Uses tiktoken when it is installed;
+    otherwise estimates one token per short word or punctuation mark and
+    one more per further six characters of a long word, which stays close
+    to the Llama tokenizers on English text.
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(1 + (len(piece) - 1) // 6 for piece in _PIECE.findall(text))
+
+
+def compact_text(text):
+    """
+    Drops what costs tokens without carrying content: indentation, runs of
+    spaces, empty table cells, blank lines and rows repeated verbatim.
+    """
+    lines = []
+    seen = set()
+    for line in str(text or "").splitlines():
+        line = " ".join(line.split())
+        line = _EMPTY_CELLS.sub(" |", line).strip(" |")
+        if line and line not in seen:
+            seen.add(line)
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _keep_ends(pieces, budget, joiner, unit, level):
+    """
+    Keeps whole pieces from the start (up to two thirds of the budget) and
+    from the end, replacing the middle with an omission marker. The budget
+    left over goes to further pieces after the head, and then to the first
+    piece that did not fit, cut down at the next finer level, so one
+    oversize row among short ones (a pasted essay) is shortened instead of
+    dropped. Returns None if no whole piece fits, so the caller can split
+    finer.
+    """
+    budget -= MARKER_TOKENS
+    # Line breaks cost a token; a space is part of the next word's token
+    costs = [count_tokens(piece) + (joiner == "\n") for piece in pieces]
+    head = []
+    used = 0
+    for piece, cost in zip(pieces, costs):
+        if used + cost > budget * 2 // 3:
+            break
+        head.append(piece)
+        used += cost
+    tail = []
+    for piece, cost in zip(reversed(pieces[len(head):]), reversed(costs[len(head):])):
+        if used + cost > budget:
+            break
+        tail.insert(0, piece)
+        used += cost
+    if not head and not tail:
+        return None
+    middle = len(pieces) - len(tail)
+    while len(head) < middle and used + costs[len(head)] <= budget:
+        used += costs[len(head)]
+        head.append(pieces[len(head)])
+    kept = list(head)
+    omitted = middle - len(head)
+    if omitted and budget - used >= MIN_PIECE_TOKENS:
+        partial = _shorten(pieces[len(head)], budget - used, level + 1)
+        if partial:
+            kept.append(partial)
+            omitted -= 1
+    if omitted:
+        kept.append(f"[... {omitted} of {len(pieces)} {unit} omitted ...]")
+    return joiner.join(kept + tail)
+
+
+_LEVELS = (
+    (lambda text: text.split("\n"), "\n", "rows"),
+    (lambda text: _SENTENCE_END.split(text.replace("\n", " ")), " ", "sentences"),
+    (lambda text: text.split(), " ", "words"),
+)
+
+
+def _shorten(text, budget, level=0):
+    """
+    Cuts text down to budget tokens, starting at the given level of
+    _LEVELS and moving to finer ones while that level cannot keep a whole
+    piece.
+    """
+    for index in range(level, len(_LEVELS)):
+        split, joiner, unit = _LEVELS[index]
+        pieces = [piece for piece in split(text) if piece]
+        if len(pieces) > 1:
+            shortened = _keep_ends(pieces, budget, joiner, unit, index)
+            if shortened is not None:
+                return shortened
+    return ""
+
+
+def truncate_to_tokens(text, budget):
+    """
+    Compacts text and, if it is still over budget tokens, cuts out its
+    middle: whole table rows if they fit, else whole sentences, else words.
+    The beginning and the end of a section usually carry the most weight
+    (what was planned, and the conclusion).
+    """
+    text = compact_text(text)
+    if count_tokens(text) <= budget:
+        return text
+    return _shorten(text, budget)
+
+
+def allocate(sizes, total, cap):
+    """
+    Splits total tokens between sections of the given sizes: sections
+    below the fair share keep their full size and the rest is shared
+    equally by the larger ones, none getting more than cap.
+    """
+    budgets = {}
+    remaining = dict(sizes)
+    left = total
+    while remaining:
+        share = min(cap, left // len(remaining))
+        fitting = {key: size for key, size in remaining.items() if size <= share}
+        if not fitting:
+            budgets.update((key, share) for key in remaining)
+            break
+        for key, size in fitting.items():
+            budgets[key] = size
+            left -= size
+            del remaining[key]
+    return budgets
+
+
+def fit_sections(mte_data, keys, total=None, cap=None):
+    """
+    Returns (sections, truncated): the compacted text of each section in
+    keys, cut down to fit PROMPT_BUDGET, and the keys that were shortened.
+    """
+    total = total or PROMPT_BUDGET["submission_tokens"]
+    cap = cap or PROMPT_BUDGET["section_tokens"]
+    sections = {key: compact_text(mte_data.get(key)) for key in keys}
+    sizes = {key: count_tokens(text) for key, text in sections.items()}
+    budgets = allocate(sizes, total, cap)
+    truncated = [key for key in keys if sizes[key] > budgets[key]]
+    for key in truncated:
+        sections[key] = truncate_to_tokens(sections[key], budgets[key])
+    return sections, truncated
@@ -0,0 +1,98 @@
+# rate_limiter.py
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket holding at most `per_minute` units.
+    Reservations may drive the level negative; the caller then waits until
+    the deficit has been refilled, which keeps waiting callers in FIFO order.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """
+        Takes `amount` units and returns how many seconds the caller must wait.
+        """
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount, now):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class ModelRateLimiter:
+    """
+    Tracks requests/min and tokens/min per model and tells callers how long
+    to wait before sending. Safe to share between threads and event loops.
+    """
+
+    def __init__(self, limits):
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._tokens = {}
+        self._blocked_until = {}
+        for model, limit in limits.items():
+            self._requests[model] = TokenBucket(limit["requests_per_minute"])
+            self._tokens[model] = TokenBucket(limit["tokens_per_minute"])
+
+    def reserve(self, model, tokens):
+        """
+        Reserves one request and `tokens` tokens for the model and returns
+        the delay in seconds before the request may be sent. Models without
+        configured limits are never delayed.
+        """
+        with self._lock:
+            if model not in self._requests:
+                return 0.0
+            now = time.monotonic()
+            wait = max(
+                self._requests[model].reserve(1, now),
+                self._tokens[model].reserve(tokens, now),
+                self._blocked_until.get(model, 0.0) - now
+            )
+            return max(0.0, wait)
+
+    def acquire(self, model, tokens):
+        delay = self.reserve(model, tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, model, tokens):
+        delay = self.reserve(model, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def settle(self, model, reserved, used):
+        """
+        Returns over-reserved tokens once the real usage is known.
+        """
+        with self._lock:
+            if model not in self._tokens:
+                return
+            bucket = self._tokens[model]
+            # reserve() never takes more than the bucket's capacity
+            reserved = min(reserved, bucket.capacity)
+            if used < reserved:
+                bucket.refund(reserved - used, time.monotonic())
+
+    def backoff(self, model, seconds):
+        """
+        Blocks every request to the model for `seconds`, e.g. from a 429 retry-after.
+        """
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._blocked_until[model] = max(self._blocked_until.get(model, 0.0), until)
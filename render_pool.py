@@ -0,0 +1,82 @@
+# render_pool.py
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def init_worker():
+    """
+    Process initializer: parses the fonts before the first report arrives.
+    """
+    from pdf_renderer import get_renderer
+    get_renderer()
+
+
+def render_report(feedback):
+    # fpdf and fontTools load on first use, so importing the pool stays cheap
+    from pdf_renderer import get_renderer
+    return get_renderer().render(feedback)
+
+
+class RenderPool:
+    """
+    Renders feedback dicts to PDF bytes on a pool of worker processes,
+    each with its own warm ReportRenderer.
+
+    At most max_pending renders are queued or running at once; submit()
+    blocks beyond that, so a fast producer cannot pile up feedback dicts
+    and finished PDFs in memory.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._closed = False
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+
+    def submit(self, feedback):
+        """
+        Queues one report and returns a Future of its PDF bytes.
+        """
+        if self._closed:
+            raise RuntimeError("RenderPool is shut down")
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(render_report, feedback)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def render(self, feedback):
+        return self.submit(feedback).result()
+
+    def map(self, feedbacks):
+        """
+        Yields the PDF bytes of each feedback dict, in input order.
+        """
+        pending = deque()
+        for feedback in feedbacks:
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().result()
+            pending.append(self.submit(feedback))
+        while pending:
+            yield pending.popleft().result()
+
+    def shutdown(self, wait=True):
+        """
+        Stops accepting work. With wait=False, queued renders are cancelled
+        and the call returns without waiting for running ones.
+        """
+        self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=exc_type is None)
+        return False
@@ -0,0 +1,83 @@
+# result_cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+class ResultCache:
+    """
+    On-disk cache of evaluation results in SQLite, with a TTL and
+    least-recently-used eviction once max_entries is exceeded.
+    """
+
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None if missing or expired.
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if now - created > self.ttl_seconds:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            conn.execute("DELETE FROM results WHERE created < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def delete(self, *keys):
+        with self._lock, self._connect() as conn:
+            conn.executemany("DELETE FROM results WHERE key = ?", [(key,) for key in keys])
+
+
+def normalize_text(value):
+    if not isinstance(value, str):
+        return ""
+    value = unicodedata.normalize("NFKC", value)
+    return " ".join(value.split())
+
+
+def make_key(sections, *parts):
+    """
+    Hashes normalized section texts together with extra key parts
+    (model name, prompt version) into a stable cache key.
+    """
+    payload = {
+        "sections": {key: normalize_text(value) for key, value in sorted(sections.items())},
+        "parts": [str(part) for part in parts]
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
@@ -0,0 +1,130 @@
+# stream_parser.py
+import json
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class StreamingFeedbackParser:
+    """
+    Incrementally parses the feedback JSON while the completion streams in.
+
+    feed() returns the events completed by each chunk:
+      ("section", key, details)  once an entry of "section_scores" closes
+      ("done", feedback)         once the top-level object closes
+    Reasoning blocks (<think>...</think>) and any text around the JSON
+    object, such as code fences, are skipped.
+    """
+
+    def __init__(self):
+        self.raw = []
+        self.json_text = []
+        self.done = False
+        self._pending = ""
+        self._in_think = False
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+
+    def feed(self, chunk):
+        if not chunk or self.done:
+            return []
+        self.raw.append(chunk)
+        events = []
+        for text in self._visible(chunk):
+            for char in text:
+                events.extend(self._consume(char))
+                if self.done:
+                    return events
+        return events
+
+    def text(self):
+        return "".join(self.raw)
+
+    def _visible(self, chunk):
+        """
+        Yields the parts of chunk outside reasoning blocks. Reasoning is only
+        stripped before the JSON starts, so tags quoted inside strings survive.
+        """
+        if self._stack:
+            text, self._pending = self._pending + chunk, ""
+            yield text
+            return
+        text = self._pending + chunk
+        self._pending = ""
+        while text:
+            tag = THINK_CLOSE if self._in_think else THINK_OPEN
+            index = text.find(tag)
+            if index >= 0:
+                if not self._in_think:
+                    yield text[:index]
+                self._in_think = not self._in_think
+                text = text[index + len(tag):]
+                continue
+            # Hold back a possible partial tag at the end of the chunk
+            keep = 0
+            for size in range(len(tag) - 1, 0, -1):
+                if text.endswith(tag[:size]):
+                    keep = size
+                    break
+            if not self._in_think:
+                yield text[:len(text) - keep]
+            self._pending = text[len(text) - keep:]
+            return
+
+    def _consume(self, char):
+        if not self._stack:
+            if char == "{":
+                self.json_text = ["{"]
+                self._stack.append({"start": 0, "key": None, "parent_key": None})
+            return []
+
+        position = len(self.json_text)
+        self.json_text.append(char)
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._last_string = "".join(self.json_text[self._string_start + 1:position])
+            return []
+
+        if char == '"':
+            self._in_string = True
+            self._string_start = position
+        elif char == ":" and self._stack[-1] is not None:
+            self._stack[-1]["key"] = self._last_string
+        elif char in "{[":
+            parent_key = self._stack[-1]["key"] if self._stack[-1] is not None else None
+            self._stack.append({"start": position, "key": None, "parent_key": parent_key} if char == "{" else None)
+        elif char in "}]":
+            closed = self._stack.pop()
+            if not self._stack:
+                return self._finish()
+            if closed is not None and self._is_section():
+                try:
+                    details = json.loads("".join(self.json_text[closed["start"]:position + 1]))
+                    return [("section", closed["parent_key"], details)]
+                except json.JSONDecodeError:
+                    return []
+        return []
+
+    def _is_section(self):
+        # root -> "section_scores" object -> section entry
+        return (
+            len(self._stack) == 2
+            and self._stack[1] is not None
+            and self._stack[1]["parent_key"] == "section_scores"
+        )
+
+    def _finish(self):
+        self.done = True
+        try:
+            return [("done", json.loads("".join(self.json_text)))]
+        except json.JSONDecodeError:
+            return [("done", {"error": "Invalid JSON from model."})]
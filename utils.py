@@ -1,25 +1,29 @@
 # utils.py
 import json
 import unicodedata
-from openpyxl import load_workbook
-from openpyxl.styles.borders import Border
 from collections import deque
 import os
 import re
 from datetime import datetime
-from openpyxl.styles import Border
+from config import EXTRACT_BACKEND, FEEDBACK_HISTORY_DIR
+import ooxml_reader
+
+_system_config = None
 
 def load_json():
     """
     Load JSON data from the file and return it as a dictionary.
+    The file is read on the first successful call and reused afterwards.
     """
-    try:
-        with open("system_config.json", 'r') as file:
-            data = json.load(file)
-        return data
-    except Exception as e:
-        print(f"Error loading JSON file: {e}")
-        return None
+    global _system_config
+    if _system_config is None:
+        try:
+            with open("system_config.json", 'r') as file:
+                _system_config = json.load(file)
+        except Exception as e:
+            print(f"Error loading JSON file: {e}")
+            return None
+    return _system_config
 
 def get_api_key_from_json(key_name):
     """
@@ -33,83 +37,178 @@ def get_api_key_from_json(key_name):
         return None
 
 
-def extract_mte_data(file_path):
-    def normalize(value):
-        if not isinstance(value, str):
-            return ""
-        return unicodedata.normalize("NFKD", value).strip()
+BORDER_SIDES = ("left", "right", "top", "bottom")
+
+HEADING_TO_KEY_MAP = {
+    "Academic Progress / Vacation Plan": "academic_progress",
+    "Co and Extra Curricular Progress-Plan": "co-curricular",
+    "Fin Reqm for the next 3 months (Details Please)": "financial_needs",
+    "Difficulties (Social, Family, etc.)": "difficulties",
+    "Results of the exams": "exam_results",
+    "Reading Books / Watching Videos": "books_and_videos",
+    "exercise regularly and eat and sleep": "health",
+    "friends or acquaintances made": "learning_from_people",
+    "Essay on a topic of your choice": "essay",
+    "Action Plan for the coming month": "action_plan"
+}
+
+MERGE_REF = re.compile(rb'<(?:\w+:)?mergeCell\s+ref="([A-Z]+[0-9]+):([A-Z]+[0-9]+)"')
+
 
-    def has_border(cell):
-        border: Border = cell.border
-        sides = [border.left, border.right, border.top, border.bottom]
-        return any(side.style is not None for side in sides)
+def normalize(value):
+    if not isinstance(value, str):
+        return ""
+    return unicodedata.normalize("NFKD", value).strip()
+
+
+def styled_sides(border):
+    """
+    Returns the names of the border sides that have a style.
+    """
+    if border is None:
+        return frozenset()
+    return frozenset(name for name in BORDER_SIDES if getattr(border, name) is not None and getattr(border, name).style is not None)
+
+
+def read_merged_ranges(source):
+    """
+    Scans worksheet XML for <mergeCell> refs without parsing the cells.
+    Merges follow </sheetData>, so only the tail of the stream is searched.
+    Returns a list of (min_row, min_col, max_row, max_col).
+    """
+    tail = b""
+    found = False
+    while True:
+        chunk = source.read(1 << 20)
+        if not chunk:
+            break
+        tail += chunk
+        if not found:
+            index = tail.find(b"</sheetData>")
+            if index < 0:
+                tail = tail[-16:]
+                continue
+            found = True
+            tail = tail[index:]
+
+    from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+    ranges = []
+    for start, end in MERGE_REF.findall(tail):
+        min_col, min_row = coordinate_from_string(start.decode())
+        max_col, max_row = coordinate_from_string(end.decode())
+        ranges.append((min_row, column_index_from_string(min_col), max_row, column_index_from_string(max_col)))
+    return ranges
+
+
+def apply_merged_ranges(values, border_rows, border_sides, merged_ranges):
+    """
+    Reproduces how openpyxl's full loader treats merged ranges: cells other
+    than the top-left one lose their value and border, then edge cells take
+    the matching border sides of the top-left cell.
+    """
+    for min_row, min_col, max_row, max_col in merged_ranges:
+        for r in range(min_row, max_row + 1):
+            for c in range(min_col, max_col + 1):
+                if (r, c) != (min_row, min_col):
+                    values.pop((r, c), None)
+                    border_rows[r] = border_rows.get(r, 0) & ~(1 << c)
+
+        sides = border_sides.get((min_row, min_col), frozenset())
+        edges = {
+            "top": [(min_row, c) for c in range(min_col, max_col + 1)],
+            "bottom": [(max_row, c) for c in range(min_col, max_col + 1)],
+            "left": [(r, min_col) for r in range(min_row, max_row + 1)],
+            "right": [(r, max_col) for r in range(min_row, max_row + 1)],
+        }
+        for side in sides:
+            for r, c in edges[side]:
+                border_rows[r] = border_rows.get(r, 0) | (1 << c)
+
+
+def read_sheet_grid(file_path):
+    """
+    Streams the first worksheet once in read-only mode and returns
+    (values, border_rows):
+      values       {(row, col): normalized text} for non-empty text cells
+      border_rows  {row: bitmask}, bit c set when column c has a border
+    """
+    # openpyxl is only needed on this path, not by the default OOXML backend
+    from openpyxl import load_workbook
+    from openpyxl.cell.read_only import EMPTY_CELL
 
+    workbook = load_workbook(file_path, read_only=True)
     try:
-        workbook = load_workbook(file_path)
         sheet = workbook.worksheets[0]
+        # Declared dimensions are unreliable in hand-edited templates
+        sheet.reset_dimensions()
 
-        # --- Extract raw metadata lines (Rows 2 and 4 expected, fallback if missing) ---
-        raw_student_info = normalize(sheet.cell(2, 2).value or "")
-        raw_college_info = normalize(sheet.cell(4, 2).value or "")
-
-        # --- Extract Name and Month robustly ---
-        student_name, submission_month = "N/A", "N/A"
-        student_match = re.search(r"Student\s*[:\-]?\s*(.+?)\s+for\s+the\s+month\s+of\s+([A-Za-z]+)", raw_student_info, re.IGNORECASE)
-        if student_match:
-            student_name = student_match.group(1).strip()
-            submission_month = f"{student_match.group(2).capitalize()} , {datetime.now().year}"
-
-        # --- Clean and Normalize College/Class Line ---
-        raw_college_info_clean = re.sub(r"[_\s]+", " ", raw_college_info).strip()
-
-        college_name, class_info = "N/A", "N/A"
-        match_college = re.search(r"College\s*[:\-]?\s*(.+?)\s+Year\s+of\s+Study", raw_college_info_clean, re.IGNORECASE)
-        match_year = re.search(r"Year\s+of\s+Study\s*[:\-]?\s*(.+)", raw_college_info_clean, re.IGNORECASE)
-        if match_college:
-            college_name = match_college.group(1).strip()
-        if match_year:
-            class_info = match_year.group(1).strip()
-
-        # --- Extract bordered tables ---
-        border_map = {}
+        values = {}
+        border_rows = {}
+        border_sides = {}
+        sides_by_style = {}
         for row in sheet.iter_rows():
             for cell in row:
-                if has_border(cell):
-                    border_map[(cell.row, cell.column)] = normalize(cell.value)
-
-        visited = set()
-        groups = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-
-        for cell in border_map:
-            if cell not in visited:
-                group = []
-                queue = deque([cell])
-                visited.add(cell)
-                while queue:
-                    current = queue.popleft()
-                    group.append(current)
-                    for dr, dc in directions:
-                        neighbor = (current[0] + dr, current[1] + dc)
-                        if neighbor in border_map and neighbor not in visited:
-                            visited.add(neighbor)
-                            queue.append(neighbor)
-                groups.append(group)
-
-        extracted_tables = []
-        for group in groups:
-            rows = [r for r, _ in group]
-            cols = [c for _, c in group]
-            min_row, max_row = min(rows), max(rows)
-            min_col, max_col = min(cols), max(cols)
+                if cell is EMPTY_CELL:
+                    continue
+                text = normalize(cell.value)
+                if text:
+                    values[(cell.row, cell.column)] = text
+                border_id = cell.style_array.borderId
+                sides = sides_by_style.get(border_id)
+                if sides is None:
+                    sides = sides_by_style[border_id] = styled_sides(cell.border)
+                if sides:
+                    border_rows[cell.row] = border_rows.get(cell.row, 0) | (1 << cell.column)
+                    border_sides[(cell.row, cell.column)] = sides
+
+        with sheet._get_source() as source:
+            merged_ranges = read_merged_ranges(source)
+    finally:
+        workbook.close()
+
+    apply_merged_ranges(values, border_rows, border_sides, merged_ranges)
+    return values, border_rows
+
+
+def find_tables(values, border_rows):
+    """
+    Groups bordered cells into 4-connected components and returns each
+    component's bounding box as a table {"heading": ..., "rows": ...}.
+    """
+    def is_bordered(r, c):
+        return c > 0 and (border_rows.get(r, 0) >> c) & 1
+
+    visited = set()
+    extracted_tables = []
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+    for row in sorted(border_rows):
+        mask = border_rows[row]
+        col = 0
+        while mask >> col:
+            if not (mask >> col) & 1 or (row, col) in visited:
+                col += 1
+                continue
+
+            min_row = max_row = row
+            min_col = max_col = col
+            queue = deque([(row, col)])
+            visited.add((row, col))
+            while queue:
+                r, c = queue.popleft()
+                min_row, max_row = min(min_row, r), max(max_row, r)
+                min_col, max_col = min(min_col, c), max(max_col, c)
+                for dr, dc in directions:
+                    neighbor = (r + dr, c + dc)
+                    if neighbor not in visited and is_bordered(*neighbor):
+                        visited.add(neighbor)
+                        queue.append(neighbor)
+            col += 1
 
             table = []
             for r in range(min_row, max_row + 1):
-                row_data = []
-                for c in range(min_col, max_col + 1):
-                    value = normalize(sheet.cell(r, c).value)
-                    if value:
-                        row_data.append(value)
+                row_data = [values[(r, c)] for c in range(min_col, max_col + 1) if (r, c) in values]
                 if row_data:
                     table.append(row_data)
 
@@ -118,56 +217,108 @@ def extract_mte_data(file_path):
                 rows_as_string = "\n".join("    " + " | ".join(row) for row in table[1:])
                 extracted_tables.append({"heading": heading.strip(), "rows": rows_as_string.strip()})
 
-        # --- Map headings to dictionary keys ---
-        mte_dict = {}
-        heading_to_key_map = {
-            "Academic Progress / Vacation Plan": "academic_progress",
-            "Co and Extra Curricular Progress-Plan": "co-curricular",
-            "Fin Reqm for the next 3 months (Details Please)": "financial_needs",
-            "Difficulties (Social, Family, etc.)": "difficulties",
-            "Results of the exams": "exam_results",
-            "Reading Books / Watching Videos": "books_and_videos",
-            "exercise regularly and eat and sleep": "health",
-            "friends or acquaintances made": "learning_from_people",
-            "Essay on a topic of your choice": "essay",
-            "Action Plan for the coming month": "action_plan"
-        }
+    return extracted_tables
 
-        for table in extracted_tables:
-            for expected_heading, dict_key in heading_to_key_map.items():
-                if expected_heading.lower() in table['heading'].lower():
-                    mte_dict[dict_key] = table['rows']
-                    break
-
-        return {
-            "student_name": student_name,
-            "submission_month": submission_month,
-            "college_name": college_name,
-            "class_info": class_info,
-            "academic_progress": mte_dict.get("academic_progress", ""),
-            "co-curricular": mte_dict.get("co-curricular", ""),
-            "financial_needs": mte_dict.get("financial_needs", ""),
-            "difficulties": mte_dict.get("difficulties", ""),
-            "exam_results": mte_dict.get("exam_results", ""),
-            "books_and_videos": mte_dict.get("books_and_videos", ""),
-            "health": mte_dict.get("health", ""),
-            "learning_from_people": mte_dict.get("learning_from_people", ""),
-            "essay": mte_dict.get("essay", ""),
-            "action_plan": mte_dict.get("action_plan", "")
-        }
 
+def build_mte_dict(values, border_rows):
+    """
+    Turns a sheet grid into the MTE dictionary returned by extract_mte_data.
+    """
+    # --- Extract raw metadata lines (Rows 2 and 4 expected, fallback if missing) ---
+    raw_student_info = values.get((2, 2), "")
+    raw_college_info = values.get((4, 2), "")
+
+    # --- Extract Name and Month robustly ---
+    student_name, submission_month = "N/A", "N/A"
+    student_match = re.search(r"Student\s*[:\-]?\s*(.+?)\s+for\s+the\s+month\s+of\s+([A-Za-z]+)", raw_student_info, re.IGNORECASE)
+    if student_match:
+        student_name = student_match.group(1).strip()
+        submission_month = f"{student_match.group(2).capitalize()} , {datetime.now().year}"
+
+    # --- Clean and Normalize College/Class Line ---
+    raw_college_info_clean = re.sub(r"[_\s]+", " ", raw_college_info).strip()
+
+    college_name, class_info = "N/A", "N/A"
+    match_college = re.search(r"College\s*[:\-]?\s*(.+?)\s+Year\s+of\s+Study", raw_college_info_clean, re.IGNORECASE)
+    match_year = re.search(r"Year\s+of\s+Study\s*[:\-]?\s*(.+)", raw_college_info_clean, re.IGNORECASE)
+    if match_college:
+        college_name = match_college.group(1).strip()
+    if match_year:
+        class_info = match_year.group(1).strip()
+
+    # --- Map headings to dictionary keys ---
+    mte_dict = {}
+    for table in find_tables(values, border_rows):
+        for expected_heading, dict_key in HEADING_TO_KEY_MAP.items():
+            if expected_heading.lower() in table['heading'].lower():
+                mte_dict[dict_key] = table['rows']
+                break
+
+    return {
+        "student_name": student_name,
+        "submission_month": submission_month,
+        "college_name": college_name,
+        "class_info": class_info,
+        "academic_progress": mte_dict.get("academic_progress", ""),
+        "co-curricular": mte_dict.get("co-curricular", ""),
+        "financial_needs": mte_dict.get("financial_needs", ""),
+        "difficulties": mte_dict.get("difficulties", ""),
+        "exam_results": mte_dict.get("exam_results", ""),
+        "books_and_videos": mte_dict.get("books_and_videos", ""),
+        "health": mte_dict.get("health", ""),
+        "learning_from_people": mte_dict.get("learning_from_people", ""),
+        "essay": mte_dict.get("essay", ""),
+        "action_plan": mte_dict.get("action_plan", "")
+    }
+
+
+def read_sheet_grid_ooxml(file_path):
+    """
+    Same contract as read_sheet_grid, but reads the .xlsx zip directly
+    (see ooxml_reader) instead of going through openpyxl.
+    """
+    raw_values, border_rows, border_sides, merged_ranges = ooxml_reader.read_sheet_grid(file_path)
+    values = {}
+    for coordinate, value in raw_values.items():
+        text = normalize(value)
+        if text:
+            values[coordinate] = text
+    apply_merged_ranges(values, border_rows, border_sides, merged_ranges)
+    return values, border_rows
+
+
+def extract_mte_data(file_path, backend=None):
+    """
+    Extracts student metadata and the bordered section tables from an MTE workbook.
+    Accepts a path or a binary file-like object. backend is "ooxml" or
+    "openpyxl" (default: EXTRACT_BACKEND); the OOXML reader falls back to
+    openpyxl for files it does not handle.
+    """
+    try:
+        grid = None
+        if (backend or EXTRACT_BACKEND) == "ooxml":
+            try:
+                grid = read_sheet_grid_ooxml(file_path)
+            except Exception as e:
+                print(f"OOXML reader fell back to openpyxl: {e}")
+                if hasattr(file_path, "seek"):
+                    file_path.seek(0)
+        if grid is None:
+            grid = read_sheet_grid(file_path)
+        return build_mte_dict(*grid)
     except Exception as e:
         return {"error": f"Error extracting data: {e}"}
 
 
 
-def save_feedback_to_json(feedback, student_id):
+def save_feedback_to_json(feedback, student_id, history_dir=None):
     """
     Saves the generated feedback to a JSON file to track historical data for students.
+    Files go to history_dir, FEEDBACK_HISTORY_DIR by default.
     """
     try:
-        history_dir = "../data/history"
-        file_path = f"{history_dir}/{student_id}_feedback.json"
+        history_dir = history_dir or FEEDBACK_HISTORY_DIR
+        file_path = os.path.join(history_dir, f"{student_id}_feedback.json")
         
         os.makedirs(history_dir, exist_ok=True)
         